@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+
+from benchmarks import (  # noqa: F401
+    compression,
+    login_load,
+    projection,
+    search,
+    serialization,
+    tokens,
+    trigram,
+)
+from benchmarks.harness import BENCHMARKS, report
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='benchmarks')
+    parser.add_argument(
+        'names',
+        nargs='*',
+        help=f'Any of {", ".join(BENCHMARKS)}, all by default',
+    )
+    args = parser.parse_args(argv)
+
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    for name in args.names or BENCHMARKS:
+        report(name, asyncio.run(BENCHMARKS[name]()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+from benchmarks.harness import Result, benchmark, measure
+from madr.compression import COMPRESSORS
+from madr.pagination import page_json
+from madr.routes.books import BOOK_FIELDS
+
+PAGE = 500
+LEVELS = {'zstd': (1, 3, 9), 'br': (1, 4, 9), 'gzip': (1, 6, 9)}
+
+
+def book_page() -> bytes:
+    rows = [
+        (1900 + i % 120, f'the book number {i} of the catalog', i % 97, i)
+        for i in range(PAGE)
+    ]
+
+    return page_json('books', rows, BOOK_FIELDS, 'eyJpZCI6IDUwMH0')
+
+
+@benchmark('compression')
+async def codings() -> list[Result]:
+    """CPU against bytes saved on a 500 books page, for each installed
+    coding at a fast, the default and a slow level."""
+    body = book_page()
+    results = [Result('identity', {'bytes': len(body)})]
+
+    for coding, compressor in COMPRESSORS.items():
+        for level in LEVELS[coding]:
+
+            def compress(compressor=compressor, level=level):
+                instance = compressor(level)
+                return instance.compress(body) + instance.finish()
+
+            timing = await measure(compress, 50)
+            size = len(compress())
+            results.append(
+                Result(
+                    f'{coding}_{level}',
+                    {
+                        'cpu_us': timing.metrics()['cpu_us'],
+                        'bytes': size,
+                        'saved_pct': round(100 * (1 - size / len(body)), 1),
+                    },
+                )
+            )
+
+    return results
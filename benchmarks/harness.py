@@ -0,0 +1,163 @@
+import inspect
+import statistics
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from madr.app import app
+from madr.database import (
+    engine,
+    get_read_engine,
+    get_read_session,
+    get_session,
+)
+
+Benchmark = Callable[[], Awaitable[list['Result']]]
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    """Register the decorated coroutine function as ``name``."""
+
+    def register(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+@dataclass(frozen=True)
+class Result:
+    case: str
+    metrics: dict[str, float | int]
+
+
+@dataclass(frozen=True)
+class Timing:
+    wall: float
+    cpu: float
+
+    def metrics(self, unit: str = 'us') -> dict[str, float]:
+        scale = {'us': 1e6, 'ms': 1e3}[unit]
+
+        return {
+            f'wall_{unit}': round(self.wall * scale, 2),
+            f'cpu_{unit}': round(self.cpu * scale, 2),
+        }
+
+
+async def measure(func: Callable, number: int, rounds: int = 5) -> Timing:
+    """Median wall and CPU seconds per call of ``func`` over ``rounds``
+    of ``number`` calls, after a warm-up call. Awaitables it returns are
+    awaited within the call."""
+    walls, cpus = [], []
+
+    for round_ in range(rounds + 1):
+        wall, cpu = time.perf_counter(), time.process_time()
+        for _ in range(number if round_ else 1):
+            result = func()
+            if inspect.isawaitable(result):
+                await result
+
+        if round_:
+            walls.append((time.perf_counter() - wall) / number)
+            cpus.append((time.process_time() - cpu) / number)
+
+    return Timing(statistics.median(walls), statistics.median(cpus))
+
+
+@asynccontextmanager
+async def catalog(authors: int, books: int) -> AsyncIterator[AsyncSession]:
+    """Session over ``books`` books spread across ``authors`` authors.
+
+    Everything runs in one transaction rolled back on exit, leaving the
+    database of ``DATABASE_URL`` as it was.
+    """
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(connection, expire_on_commit=False)
+
+        try:
+            first_author = await session.scalar(
+                text(
+                    'WITH inserted AS (INSERT INTO authors (name) '
+                    "SELECT 'benchmark author ' || i "
+                    'FROM generate_series(1, :authors) AS i RETURNING id) '
+                    'SELECT min(id) FROM inserted'
+                ),
+                {'authors': authors},
+            )
+            await session.execute(
+                text(
+                    'INSERT INTO books (title, year, author_id) '
+                    "SELECT 'benchmark book ' || i, 1900 + i % 120, "
+                    ':first_author + i % :authors '
+                    'FROM generate_series(1, :books) AS i'
+                ),
+                {
+                    'first_author': first_author,
+                    'authors': authors,
+                    'books': books,
+                },
+            )
+            await session.execute(text('ANALYZE authors, books'))
+            # Autovacuum would have merged the fresh rows into the GIN
+            # indexes, instead of leaving them for every query to scan.
+            await session.execute(
+                text(
+                    'SELECT gin_clean_pending_list(indexrelid) '
+                    'FROM pg_index JOIN pg_class ON pg_class.oid = indexrelid '
+                    'JOIN pg_am ON pg_am.oid = relam '
+                    "WHERE amname = 'gin' "
+                    "AND indrelid IN ('authors'::regclass, 'books'::regclass)"
+                )
+            )
+
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+
+async def _raise_for_status(response):
+    # Timing errors or redirects would say nothing about the endpoint.
+    response.raise_for_status()
+
+
+@asynccontextmanager
+async def client(
+    session: AsyncSession | None = None,
+) -> AsyncIterator[AsyncClient]:
+    """Client of the app whose requests all go through ``session``.
+
+    Without one, each request opens its own, as in production, which
+    concurrent requests need.
+    """
+    if session is not None:
+        app.dependency_overrides[get_session] = lambda: session
+        app.dependency_overrides[get_read_session] = lambda: session
+        app.dependency_overrides[get_read_engine] = lambda: session.bind
+
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url='http://benchmark',
+            event_hooks={'response': [_raise_for_status]},
+        ) as http:
+            yield http
+    finally:
+        app.dependency_overrides.clear()
+
+
+def report(name: str, results: list[Result]):
+    for result in results:
+        metrics = ' '.join(
+            f'{key}={value}' for key, value in result.metrics.items()
+        )
+        print(f'{name} {result.case} {metrics}')
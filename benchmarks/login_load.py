@@ -0,0 +1,142 @@
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.harness import Result, benchmark, client
+from madr import security
+from madr.admission import LoginAdmission, RateLimit
+from madr.cache import clear_caches
+from madr.database import engine
+from madr.models import Author, Book, User, UserTombstone
+from madr.routes import auth
+
+LOGINS = 50
+BOOKS = 1_000
+EMAIL = 'login-load@benchmark.dev'
+PASSWORD = 'login-load-password'
+
+
+async def seed() -> list[int]:
+    """Committed, as concurrent requests each use their own session."""
+    async with AsyncSession(engine) as session:
+        session.add(
+            User(
+                username='login-load',
+                email=EMAIL,
+                password=security.get_password_hash(PASSWORD),
+            )
+        )
+        author_id = await session.scalar(
+            insert(Author)
+            .values(name='login load author')
+            .returning(Author.id)
+        )
+        book_ids = await session.scalars(
+            insert(Book)
+            .values([
+                {
+                    'title': f'login load book {i}',
+                    'year': 1900 + i % 120,
+                    'author_id': author_id,
+                }
+                for i in range(BOOKS)
+            ])
+            .returning(Book.id)
+        )
+        book_ids = book_ids.all()
+        await session.commit()
+
+    return book_ids
+
+
+async def clean_up():
+    async with AsyncSession(engine) as session:
+        user_id = await session.scalar(
+            delete(User).where(User.email == EMAIL).returning(User.id)
+        )
+        await session.execute(
+            delete(UserTombstone).where(UserTombstone.id == user_id)
+        )
+        author_id = select(Author.id).where(Author.name == 'login load author')
+        await session.execute(
+            delete(Book).where(Book.author_id.in_(author_id))
+        )
+        await session.execute(
+            delete(Author).where(Author.name == 'login load author')
+        )
+        await session.commit()
+
+
+async def read_latencies(http, book_ids, until=None) -> list[float]:
+    """Seconds of sequential ``GET /books/{id}``, over every book or while
+    ``until`` runs."""
+    latencies = []
+
+    for book_id in book_ids:
+        if until is not None and until.done():
+            break
+
+        start = time.perf_counter()
+        await http.get(f'/books/{book_id}')
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    cuts = statistics.quantiles(latencies, n=100)
+
+    return {
+        'reads': len(latencies),
+        'p50_ms': round(cuts[49] * 1e3, 2),
+        'p99_ms': round(cuts[98] * 1e3, 2),
+    }
+
+
+@benchmark('login_load')
+async def reads_under_login_load() -> list[Result]:
+    """``GET /books/{id}`` latency alone, then during 50 concurrent logins.
+
+    Login admission is widened so every login reaches Argon2, leaving the
+    hashing pool as the only bound.
+    """
+    book_ids = await seed()
+    admission = auth.login_admission
+    auth.login_admission = LoginAdmission(
+        max_in_flight=LOGINS,
+        identity_limit=RateLimit(LOGINS, LOGINS),
+        ip_limit=RateLimit(LOGINS, LOGINS),
+        max_tracked=LOGINS,
+        name='login_load',
+    )
+
+    try:
+        async with client() as http:
+            await http.get(f'/books/{book_ids[0]}')  # warm up
+            clear_caches()
+            idle = await read_latencies(http, book_ids)
+            clear_caches()
+
+            logins = asyncio.gather(
+                *(
+                    http.post(
+                        '/auth/token',
+                        data={'username': EMAIL, 'password': PASSWORD},
+                    )
+                    for _ in range(LOGINS)
+                )
+            )
+            loaded = await read_latencies(http, book_ids, until=logins)
+            await logins
+    finally:
+        auth.login_admission = admission
+        security.hashing_pool.shutdown()
+        await clean_up()
+
+    return [
+        Result('idle', percentiles(idle)),
+        Result('logins', percentiles(loaded)),
+    ]
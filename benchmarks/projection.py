@@ -0,0 +1,55 @@
+import gc
+import sys
+import tracemalloc
+
+from sqlalchemy import select
+
+from benchmarks.harness import Result, benchmark, catalog
+from madr.models import Book
+from madr.routes.books import BOOK_COLUMNS
+
+AUTHORS = 100
+BOOKS = 10_000
+PAGE = 1_000
+QUERIES = {
+    'entities': select(Book),
+    'columns': select(*BOOK_COLUMNS),
+    'fields': select(Book.id, Book.title),
+}
+
+
+async def page_memory(session, query) -> dict[str, int]:
+    """Memory and live blocks taken by a loaded page and what it leaves
+    in the session."""
+    await session.execute(query)  # compiled and cached beforehand
+    session.expunge_all()
+    gc.collect()
+
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    page = (await session.execute(query)).all()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks
+
+    assert len(page) == PAGE
+
+    return {
+        'peak_kib': peak // 1024,
+        'retained_kib': retained // 1024,
+        'blocks': blocks,
+    }
+
+
+@benchmark('projection')
+async def page_allocations() -> list[Result]:
+    """A 1k rows page of books loaded as entities, as the columns of the
+    response and as a ``?fields=id,title`` sparse fieldset."""
+    results = []
+
+    async with catalog(AUTHORS, BOOKS) as session:
+        for name, query in QUERIES.items():
+            metrics = await page_memory(session, query.limit(PAGE))
+            results.append(Result(name, metrics))
+
+    return results
@@ -0,0 +1,27 @@
+from benchmarks.harness import Result, benchmark, catalog, client, measure
+
+AUTHORS = 50_000
+BOOKS = 1_000_000
+QUERIES = {
+    'title': '654321',
+    'author_year': '4321 1950',
+    'prefix': '65432',
+    # Every seeded title has "book", so its whole posting list is read.
+    'common_word': 'book 654321',
+}
+
+
+@benchmark('search')
+async def ranked_search() -> list[Result]:
+    """Ranked full-text searches over a 1M books catalog."""
+    results = []
+
+    async with catalog(AUTHORS, BOOKS) as session, client(session) as http:
+        for name, query in QUERIES.items():
+            timing = await measure(
+                lambda query=query: http.get('/search/', params={'q': query}),
+                10,
+            )
+            results.append(Result(name, timing.metrics('ms')))
+
+    return results
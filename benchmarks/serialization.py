@@ -0,0 +1,42 @@
+import json
+
+from sqlalchemy import select
+
+from benchmarks.harness import Result, benchmark, catalog, client, measure
+from madr.pagination import page_json
+from madr.routes.books import BOOK_COLUMNS, BOOK_FIELDS
+from madr.schemas import BookList
+
+AUTHORS = 100
+BOOKS = 1_000
+LIMIT = 500
+
+
+@benchmark('serialization')
+async def book_pages() -> list[Result]:
+    """CPU of ``/books?limit=500``, then of serializing its rows alone,
+    straight from the tuples or validated through ``BookList`` and dumped
+    with the stdlib as the response model used to."""
+    async with catalog(AUTHORS, BOOKS) as session, client(session) as http:
+        request = await measure(
+            lambda: http.get('/books/', params={'limit': LIMIT}), 20
+        )
+        rows = (
+            await session.execute(select(*BOOK_COLUMNS).limit(LIMIT))
+        ).all()
+
+    row_tuples = await measure(
+        lambda: page_json('books', rows, BOOK_FIELDS, None), 100
+    )
+    validated = await measure(
+        lambda: json.dumps(
+            BookList.model_validate({'books': rows}).model_dump(mode='json')
+        ).encode(),
+        100,
+    )
+
+    return [
+        Result('request', request.metrics('ms')),
+        Result('row_tuples', row_tuples.metrics('ms')),
+        Result('validated', validated.metrics('ms')),
+    ]
@@ -0,0 +1,27 @@
+from benchmarks.harness import Result, benchmark, measure
+from madr import security
+
+DECODES = 10_000
+
+
+@benchmark('tokens')
+async def decode_access_token() -> list[Result]:
+    """Cold decodes verify the signature, warm ones hit the cache."""
+    token = security.create_access_token({'sub': 'benchmark@madr.dev'})
+
+    def cold():
+        security.verified_token_cache.clear()
+        security.decode_access_token(token)
+
+    cold_timing = await measure(cold, DECODES)
+    warm_timing = await measure(
+        lambda: security.decode_access_token(token), DECODES
+    )
+
+    return [
+        Result('cold', cold_timing.metrics()),
+        Result('warm', warm_timing.metrics()),
+        Result(
+            'speedup', {'cpu': round(cold_timing.cpu / warm_timing.cpu, 1)}
+        ),
+    ]
@@ -0,0 +1,38 @@
+from sqlalchemy import text
+
+from benchmarks.harness import Result, benchmark, catalog, client, measure
+
+AUTHORS = 1_000_000
+BOOKS = 1_000_000
+REQUESTS = {
+    'books': '/books/?title=Book 654321',
+    'authors': '/authors/?name=Author 654321',
+}
+
+
+@benchmark('trigram')
+async def substring_filters() -> list[Result]:
+    """Substring filters through the trigram indexes, then through the
+    sequential scans they replaced."""
+    results = []
+
+    async with catalog(AUTHORS, BOOKS) as session, client(session) as http:
+        # Statements prepared under one setting would keep their plan.
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        raw_connection.driver_connection.prepare_threshold = None
+
+        for scan in ('index', 'seq'):
+            if scan == 'seq':
+                await session.execute(
+                    text(
+                        'SET LOCAL enable_indexscan = off; '
+                        'SET LOCAL enable_bitmapscan = off'
+                    )
+                )
+
+            for name, url in REQUESTS.items():
+                timing = await measure(lambda url=url: http.get(url), 5, 3)
+                results.append(Result(f'{name}_{scan}', timing.metrics('ms')))
+
+    return results
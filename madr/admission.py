@@ -0,0 +1,144 @@
+import math
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from http import HTTPStatus
+
+from fastapi import HTTPException
+
+from madr.cache import TTLCache
+from madr.settings import Settings
+
+settings = Settings()
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def consume(self, now: float) -> float:
+        """Take one token, returning 0 or the seconds until one is free."""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+
+        return (1 - self.tokens) / self.rate
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate: float
+    burst: int
+
+    @property
+    def refill_seconds(self) -> float:
+        return self.burst / self.rate
+
+
+class LoginAdmission:
+    """Caps the Argon2 work a single worker accepts for logins.
+
+    Attempts are rejected right away with 429 when ``max_in_flight``
+    verifications are already running, or when the caller IP or the
+    submitted identity ran out of tokens in its bucket.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        identity_limit: RateLimit,
+        ip_limit: RateLimit,
+        max_tracked: int,
+        name: str = 'login',
+    ):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = Counter()
+        self.identity_limit = identity_limit
+        self.ip_limit = ip_limit
+        # A bucket left alone until it refills is the same as a new one.
+        self.identity_buckets = TTLCache(
+            f'{name}_identity_buckets',
+            maxsize=max_tracked,
+            ttl=identity_limit.refill_seconds,
+        )
+        self.ip_buckets = TTLCache(
+            f'{name}_ip_buckets',
+            maxsize=max_tracked,
+            ttl=ip_limit.refill_seconds,
+        )
+
+    def _reject(self, reason: str, retry_after: float):
+        self.rejected[reason] += 1
+
+        raise HTTPException(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            detail='Too many login attempts',
+            headers={'Retry-After': str(max(1, math.ceil(retry_after)))},
+        )
+
+    @staticmethod
+    def _consume(buckets: TTLCache, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        bucket = buckets.get(key)
+
+        if bucket is None:
+            bucket = TokenBucket(limit.rate, limit.burst, now)
+
+        wait = bucket.consume(now)
+        buckets.set(key, bucket)
+
+        return wait
+
+    @asynccontextmanager
+    async def admit(self, identity: str, ip: str):
+        if self.in_flight >= self.max_in_flight:
+            self._reject('saturated', 1)
+
+        wait = self._consume(self.ip_buckets, ip, self.ip_limit)
+        if wait:
+            self._reject('ip', wait)
+
+        wait = self._consume(
+            self.identity_buckets, identity.lower(), self.identity_limit
+        )
+        if wait:
+            self._reject('identity', wait)
+
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': self.in_flight,
+            'max_in_flight': self.max_in_flight,
+            'admitted': self.admitted,
+            'rejected': dict(self.rejected),
+        }
+
+
+login_admission = LoginAdmission(
+    max_in_flight=settings.LOGIN_MAX_IN_FLIGHT,
+    identity_limit=RateLimit(
+        settings.LOGIN_IDENTITY_RATE_PER_MINUTE / 60,
+        settings.LOGIN_IDENTITY_BURST,
+    ),
+    ip_limit=RateLimit(
+        settings.LOGIN_IP_RATE_PER_MINUTE / 60, settings.LOGIN_IP_BURST
+    ),
+    max_tracked=settings.LOGIN_TRACKED_KEYS,
+)
@@ -1,9 +1,58 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
+
+from madr import database, invalidation, security
+from madr.compression import CompressionMiddleware
+from madr.routes import (
+    auth,
+    authors,
+    books,
+    imports,
+    metrics,
+    search,
+    users,
+)
+from madr.settings import Settings
+
+settings = Settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    engines = [database.engine, *database.replica_engines]
+
+    for engine in engines:
+        await database.warm_up(engine, settings.DATABASE_POOL_MIN_SIZE)
+    security.hashing_pool.start()
+
+    listener = None
+    if settings.CACHE_INVALIDATION_LISTEN:
+        listener = asyncio.create_task(invalidation.listener.run())
+    yield
+    if listener is not None:
+        listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener
+
+    security.hashing_pool.shutdown()
+
+    for engine in engines:
+        await engine.dispose()
 
-from madr.routes import auth, authors, books, users
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    levels={
+        'zstd': settings.COMPRESSION_ZSTD_LEVEL,
+        'br': settings.COMPRESSION_BROTLI_LEVEL,
+        'gzip': settings.COMPRESSION_GZIP_LEVEL,
+    },
+)
 
 
 @app.get('/', response_class=HTMLResponse)
@@ -15,3 +64,6 @@ app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(authors.router)
 app.include_router(books.router)
+app.include_router(search.router)
+app.include_router(imports.router)
+app.include_router(metrics.router)
@@ -0,0 +1,79 @@
+from collections.abc import Iterator, Sequence
+
+from sqlalchemy import Boolean, literal_column
+
+from madr.settings import Settings
+
+settings = Settings()
+
+# Only rows written by the INSERT itself have no ``xmax`` yet, which tells
+# them apart from rows updated by ``ON CONFLICT DO UPDATE``.
+INSERTED = literal_column('xmax = 0', Boolean).label('inserted')
+
+
+def chunked(rows: list[dict]) -> Iterator[list[dict]]:
+    """Split rows so a multi-row INSERT stays under the bind limit."""
+    size = settings.BULK_INSERT_CHUNK_SIZE
+
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def latest_by(rows: list[dict], key: str) -> list[dict]:
+    """Keep the last row for each ``key``, as an upsert can only touch a
+    row once per statement."""
+    return list({row[key]: row for row in rows}.values())
+
+
+def outcomes(
+    keys: Sequence[str],
+    created: dict[str, int],
+    invalid: set[int] = frozenset(),
+) -> list[dict]:
+    """Per-item result of a bulk insert, in request order.
+
+    ``created`` maps the unique key of each inserted row to its id. Only the
+    first item carrying a key gets the id, repeated keys are conflicts.
+    """
+    results = []
+
+    for index, key in enumerate(keys):
+        if index in invalid:
+            results.append({'index': index, 'status': 'invalid_author'})
+        elif key in created:
+            results.append({
+                'index': index,
+                'status': 'created',
+                'id': created.pop(key),
+            })
+        else:
+            results.append({'index': index, 'status': 'conflict'})
+
+    return results
+
+
+def upsert_outcomes(
+    keys: Sequence[str],
+    upserted: dict[str, tuple[int, bool]],
+    invalid: set[int] = frozenset(),
+) -> list[dict]:
+    """Per-item result of a bulk upsert, in request order.
+
+    ``upserted`` maps the unique key of each written row to its id and
+    whether it was inserted. Items repeating a key share its outcome.
+    """
+    results = []
+
+    for index, key in enumerate(keys):
+        if index in invalid:
+            results.append({'index': index, 'status': 'invalid_author'})
+            continue
+
+        row_id, inserted = upserted[key]
+        results.append({
+            'index': index,
+            'status': 'created' if inserted else 'updated',
+            'id': row_id,
+        })
+
+    return results
@@ -0,0 +1,120 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+caches: dict[str, 'TTLCache'] = {}
+
+
+class TTLCache:
+    """Size bounded LRU mapping whose entries expire after ``ttl`` seconds.
+
+    A ``maxsize`` of zero disables the cache and a falsy ``ttl`` keeps
+    entries until they are evicted or invalidated. Every cache registers
+    itself by ``name`` so its counters can be exposed on ``/metrics``.
+
+    Values computed while ``key`` may be invalidated are set along with
+    the ``generation`` of the key read beforehand, and dropped if it
+    changed meanwhile.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl: float | None = None,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[Any, float | None]] = (
+            OrderedDict()
+        )
+        # Bumped for every key when a key's own counter is discarded.
+        self._epoch = 0
+        self._generations: OrderedDict[Hashable, int] = OrderedDict()
+
+        caches[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at is None or self.timer() < expires_at:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+            del self._data[key]
+
+        self.misses += 1
+        return default
+
+    def generation(self, key: Hashable) -> tuple[int, int]:
+        return self._epoch, self._generations.get(key, 0)
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        expires_at: float | None = None,
+        generation: tuple[int, int] | None = None,
+    ):
+        if self.maxsize <= 0:
+            return
+
+        if generation is not None and generation != self.generation(key):
+            return
+
+        if expires_at is None and self.ttl:
+            expires_at = self.timer() + self.ttl
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._data.pop(key, None)
+
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._generations.move_to_end(key)
+        if len(self._generations) > max(self.maxsize, 1):
+            self._generations.popitem(last=False)
+            self._epoch += 1
+
+    def clear(self):
+        self._data.clear()
+        self._generations.clear()
+        self._epoch += 1
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def clear_caches():
+    for cache in caches.values():
+        cache.clear()
+
+
+def caches_stats() -> dict[str, dict[str, Any]]:
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Callable
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+CALIBRATION_PASSWORD = 'calibration-password'
+MIN_MEMORY_COST = 8 * 1024
+MAX_TIME_COST = 32
+
+
+def measure_verify(
+    time_cost: int, memory_cost: int, parallelism: int, rounds: int = 3
+) -> float:
+    hasher = Argon2Hasher(time_cost, memory_cost, parallelism)
+    hashed = hasher.hash(CALIBRATION_PASSWORD)
+    timings = []
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hasher.verify(CALIBRATION_PASSWORD, hashed)
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+
+def calibrate_argon2(
+    target: float,
+    memory_cost: int,
+    parallelism: int,
+    measure: Callable[[int, int, int], float] = measure_verify,
+) -> dict[str, int]:
+    """Cheapest-first search for Argon2 parameters verifying in ``target``.
+
+    The memory cost is halved until a single pass fits the target, then
+    passes are added while the verification stays within it.
+    """
+    time_cost = 1
+
+    while memory_cost > MIN_MEMORY_COST and (
+        measure(time_cost, memory_cost, parallelism) > target
+    ):
+        memory_cost //= 2
+
+    while time_cost < MAX_TIME_COST and (
+        measure(time_cost + 1, memory_cost, parallelism) <= target
+    ):
+        time_cost += 1
+
+    return {
+        'ARGON2_TIME_COST': time_cost,
+        'ARGON2_MEMORY_COST': memory_cost,
+        'ARGON2_PARALLELISM': parallelism,
+    }
+
+
+def calibrate(args: argparse.Namespace):
+    parameters = calibrate_argon2(
+        args.target_ms / 1000, args.memory_cost, args.parallelism
+    )
+
+    for key, value in parameters.items():
+        print(f'{key}={value}')
+
+
+async def run_import(args: argparse.Namespace):
+    # Importing here keeps ``calibrate`` usable without database settings.
+    from sqlalchemy.ext.asyncio import AsyncSession  # noqa: PLC0415
+
+    from madr import database, importer  # noqa: PLC0415
+
+    rejects_path = args.rejects or f'{args.file}.rejects.csv'
+
+    with (
+        open(args.file, 'rb') as source,
+        open(rejects_path, 'w', encoding='utf-8', newline='') as rejects,
+    ):
+        async with AsyncSession(database.engine) as session:
+            summary = await importer.import_catalog(
+                session,
+                args.kind,
+                args.format,
+                importer.iter_file(source),
+                rejects,
+            )
+
+    await database.engine.dispose()
+
+    return summary, rejects_path
+
+
+def import_file(args: argparse.Namespace):
+    summary, rejects_path = asyncio.run(run_import(args))
+
+    print(f'imported={summary.imported}')
+    print(f'rejected={summary.rejected}')
+    print(f'rejects={rejects_path}')
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='madr')
+    commands = parser.add_subparsers(required=True)
+
+    calibrate_parser = commands.add_parser(
+        'calibrate',
+        help='Pick Argon2 parameters for a target verification time',
+    )
+    calibrate_parser.add_argument('--target-ms', type=float, default=250)
+    calibrate_parser.add_argument(
+        '--memory-cost', type=int, default=65536, help='Upper bound in KiB'
+    )
+    calibrate_parser.add_argument('--parallelism', type=int, default=4)
+    calibrate_parser.set_defaults(func=calibrate)
+
+    import_parser = commands.add_parser(
+        'import', help='Load authors or books from a CSV/NDJSON file'
+    )
+    import_parser.add_argument('kind', choices=['authors', 'books'])
+    import_parser.add_argument('file')
+    import_parser.add_argument(
+        '--format', choices=['csv', 'ndjson'], default='csv'
+    )
+    import_parser.add_argument(
+        '--rejects', help='Defaults to <file>.rejects.csv'
+    )
+    import_parser.set_defaults(func=import_file)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+import zlib
+from collections.abc import Callable, Sequence
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# In order of preference, when installed.
+COMPRESSORS: dict[str, Callable[[int], Compressor]] = {
+    **({'zstd': ZstdCompressor} if zstandard else {}),
+    **({'br': BrotliCompressor} if brotli else {}),
+    'gzip': GzipCompressor,
+}
+
+
+def negotiate(accept_encoding: str, available: Sequence[str]) -> str | None:
+    """The ``available`` coding the client weighs the most, if any.
+
+    Ties are broken by the order of ``available``.
+    """
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        name, _, value = params.strip().partition('=')
+
+        try:
+            weight = float(value) if name.strip() == 'q' else 1.0
+        except ValueError:
+            weight = 0.0
+
+        weights[coding.strip().lower()] = weight
+
+    default = weights.get('*', 0.0)
+    best = max(available, key=lambda coding: weights.get(coding, default))
+
+    return best if weights.get(best, default) > 0 else None
+
+
+class CompressionMiddleware:
+    """Compresses response bodies with the coding negotiated per request.
+
+    Complete bodies shorter than ``minimum_size`` bytes are sent as they
+    are. Streamed bodies are compressed chunk by chunk and flushed, so
+    clients get each chunk as soon as the app sends it.
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int, levels: dict[str, int]
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressors = {
+            coding: compressor
+            for coding, compressor in COMPRESSORS.items()
+            if coding in levels
+        }
+        self.levels = levels
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        coding = None
+        if scope['type'] == 'http' and self.compressors:
+            accept_encoding = Headers(scope=scope).get('Accept-Encoding', '')
+            coding = negotiate(accept_encoding, list(self.compressors))
+
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressionResponder(
+            send,
+            coding,
+            lambda: self.compressors[coding](self.levels[coding]),
+            self.minimum_size,
+        )
+        await self.app(scope, receive, responder.send)
+
+
+def weaken_etag(headers: MutableHeaders):
+    """Compressed bytes differ, so only weak validators still hold."""
+    etag = headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        headers['ETag'] = f'W/{etag}'
+
+
+class CompressionResponder:
+    def __init__(
+        self,
+        send: Send,
+        coding: str,
+        compressor: Callable[[], Compressor],
+        minimum_size: int,
+    ):
+        self._send = send
+        self.coding = coding
+        self.new_compressor = compressor
+        self.minimum_size = minimum_size
+        self.start: Message | None = None
+        self.compressor: Compressor | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if message['type'] == 'http.response.start':
+            headers = Headers(raw=message['headers'])
+            self.start = message
+            self.passthrough = 'content-encoding' in headers
+            return
+
+        if message['type'] != 'http.response.body':
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.compressor is None:
+            await self._begin(body, more_body, message)
+            return
+
+        await self._send_compressed(body, more_body)
+
+    async def _flush_start(self):
+        if self.start is not None:
+            await self._send(self.start)
+            self.start = None
+
+    async def _begin(self, body: bytes, more_body: bool, message: Message):
+        # Bodiless responses, such as 304s, are never worth compressing,
+        # but stand for a compressed body and must be validated as one.
+        if not more_body and not body:
+            headers = MutableHeaders(raw=self.start['headers'])
+            headers.add_vary_header('Accept-Encoding')
+            weaken_etag(headers)
+
+        if not more_body and len(body) < self.minimum_size:
+            self.passthrough = True
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        self.compressor = self.new_compressor()
+        headers = MutableHeaders(raw=self.start['headers'])
+        headers['Content-Encoding'] = self.coding
+        headers.add_vary_header('Accept-Encoding')
+        weaken_etag(headers)
+
+        if more_body:
+            del headers['Content-Length']
+            await self._flush_start()
+            await self._send_compressed(body, more_body)
+            return
+
+        compressed = self.compressor.compress(body) + self.compressor.finish()
+        headers['Content-Length'] = str(len(compressed))
+        await self._flush_start()
+        await self._send({'type': 'http.response.body', 'body': compressed})
+
+    async def _send_compressed(self, body: bytes, more_body: bool):
+        chunk = self.compressor.compress(body)
+        if more_body:
+            chunk += self.compressor.flush()
+        else:
+            chunk += self.compressor.finish()
+
+        await self._send({
+            'type': 'http.response.body',
+            'body': chunk,
+            'more_body': more_body,
+        })
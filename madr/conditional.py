@@ -0,0 +1,96 @@
+import hashlib
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+
+from fastapi import Request, Response
+
+
+def _aware(value: datetime) -> datetime:
+    # Timestamps are stored without time zone, in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+
+    return value.astimezone(UTC)
+
+
+@dataclass(frozen=True)
+class Validators:
+    """``ETag`` and ``Last-Modified`` of a representation.
+
+    Both come from the ``id`` and ``updated_at`` of the rows it is built
+    from, so they are known before the body is serialized. Rows of each
+    table are passed as their own group. Lists are not ``dated``: the
+    newest row of a page misses rows deleted from it or moved into it.
+    """
+
+    etag: str
+    last_modified: datetime | None
+
+    @classmethod
+    def of(
+        cls, variant: str, *groups: Sequence, dated: bool = True
+    ) -> 'Validators':
+        digest = hashlib.sha256(variant.encode())
+        for group in groups:
+            digest.update(b'#')
+            for row in group:
+                digest.update(
+                    f'|{row.id}:{row.updated_at.isoformat()}'.encode()
+                )
+
+        last_modified = None
+        if dated:
+            last_modified = max(
+                (_aware(row.updated_at) for group in groups for row in group),
+                default=None,
+            )
+
+        return cls(f'"{digest.hexdigest()[:32]}"', last_modified)
+
+    def headers(self) -> dict[str, str]:
+        headers = {'ETag': self.etag}
+        if self.last_modified:
+            headers['Last-Modified'] = format_datetime(
+                self.last_modified, usegmt=True
+            )
+
+        return headers
+
+    def not_modified(self, request: Request) -> bool:
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = {
+                tag.strip().removeprefix('W/')
+                for tag in if_none_match.split(',')
+            }
+            return '*' in tags or self.etag in tags
+
+        if_modified_since = request.headers.get('If-Modified-Since')
+        if not if_modified_since or not self.last_modified:
+            return False
+
+        try:
+            since = _aware(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+
+        return self.last_modified.replace(microsecond=0) <= since
+
+
+def json_response(
+    request: Request, validators: Validators, serialize: Callable[[], bytes]
+) -> Response:
+    """Answer 304 when the client copy is current, serializing otherwise."""
+    if validators.not_modified(request):
+        return Response(
+            status_code=HTTPStatus.NOT_MODIFIED, headers=validators.headers()
+        )
+
+    return Response(
+        serialize(),
+        media_type='application/json',
+        headers=validators.headers(),
+    )
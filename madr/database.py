@@ -1,10 +1,162 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import hashlib
+import itertools
+import time
+from contextlib import AsyncExitStack
 
+from fastapi import Request
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from madr.cache import TTLCache
 from madr.settings import Settings
 
-engine = create_async_engine(Settings().DATABASE_URL)
+settings = Settings()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that also records how long checkouts wait for a slot."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def build_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    )
+
+
+class ReadRouter:
+    """Picks the engine serving read-only requests.
+
+    Reads are spread round-robin over the replicas, except for clients that
+    sent a write in the last ``pin_seconds``: those keep reading from the
+    primary so they see their own changes despite replication lag.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        pin_seconds: float,
+        max_tracked: int,
+        name: str = 'recent_writers',
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self._replicas_cycle = itertools.cycle(replicas)
+        self.recent_writers = TTLCache(
+            name, maxsize=max_tracked if pin_seconds else 0, ttl=pin_seconds
+        )
+
+    @staticmethod
+    def client_key(request: Request) -> bytes:
+        client = request.headers.get('Authorization') or (
+            request.client.host if request.client else ''
+        )
+        return hashlib.sha256(client.encode()).digest()
+
+    def record_write(self, request: Request):
+        if self.replicas:
+            self.recent_writers.set(self.client_key(request), True)
+
+    def is_pinned(self, request: Request) -> bool:
+        """Whether ``request`` comes from a client that recently wrote."""
+        return bool(self.replicas) and bool(
+            self.recent_writers.get(self.client_key(request))
+        )
+
+    def is_replica(self, engine: AsyncEngine) -> bool:
+        return engine in self.replicas
+
+    def engine_for(self, request: Request) -> AsyncEngine:
+        if not self.replicas or self.is_pinned(request):
+            return self.primary
+
+        return next(self._replicas_cycle)
+
 
+engine = build_engine(settings.DATABASE_URL)
+replica_engines = [build_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+read_router = ReadRouter(
+    engine,
+    replica_engines,
+    pin_seconds=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+    max_tracked=settings.DATABASE_READ_YOUR_WRITES_TRACKED,
+)
+
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+async def get_session(request: Request):
+    if request.method not in SAFE_METHODS:
+        read_router.record_write(request)
 
-async def get_session():
     async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
+
+
+def get_read_engine(request: Request) -> AsyncEngine:
+    """Engine for responses that open their own session while streaming."""
+    return read_router.engine_for(request)
+
+
+async def get_read_session(request: Request):
+    async with AsyncSession(
+        read_router.engine_for(request), expire_on_commit=False
+    ) as session:
+        yield session
+
+
+async def warm_up(engine: AsyncEngine, connections: int):
+    """Open ``connections`` pooled connections at once and hand them back."""
+    connections = min(connections, engine.pool.size())
+
+    async with AsyncExitStack() as stack:
+        for _ in range(connections):
+            await stack.enter_async_context(engine.connect())
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+
+    return {
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'checkouts': pool.checkouts,
+        'wait_seconds_total': pool.wait_seconds_total,
+        'wait_seconds_max': pool.wait_seconds_max,
+    }
+
+
+def violated_constraint(exc: IntegrityError) -> str:
+    """Name of the constraint ``exc`` was raised for, if the driver knows."""
+    diag = getattr(exc.orig, 'diag', None)
+
+    return getattr(diag, 'constraint_name', None) or ''
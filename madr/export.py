@@ -0,0 +1,33 @@
+from collections.abc import AsyncIterator
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from madr.settings import Settings
+
+settings = Settings()
+
+
+async def ndjson_lines(
+    engine: AsyncEngine, query: Select
+) -> AsyncIterator[bytes]:
+    """Run ``query`` on a server-side cursor, one NDJSON chunk per fetch.
+
+    The session is opened here and not taken from a dependency because it
+    has to outlive the endpoint while the response is being streamed.
+    """
+    query = query.execution_options(yield_per=settings.EXPORT_FETCH_SIZE)
+
+    async with AsyncSession(engine) as session:
+        result = await session.stream(query)
+
+        async for rows in result.mappings().partitions():
+            yield b''.join(orjson.dumps(dict(row)) + b'\n' for row in rows)
+
+
+def ndjson_response(engine: AsyncEngine, query: Select) -> StreamingResponse:
+    return StreamingResponse(
+        ndjson_lines(engine, query), media_type='application/x-ndjson'
+    )
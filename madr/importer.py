@@ -0,0 +1,230 @@
+import codecs
+import csv
+import io
+import json
+import tempfile
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import IO, Literal
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from madr.schemas import AuthorSchema, BookImportSchema
+
+Kind = Literal['authors', 'books']
+Format = Literal['csv', 'ndjson']
+
+SCHEMAS: dict[Kind, type[BaseModel]] = {
+    'authors': AuthorSchema,
+    'books': BookImportSchema,
+}
+
+STAGING = {
+    'authors': """
+        CREATE TEMP TABLE import_authors (
+            line bigint PRIMARY KEY,
+            name text NOT NULL,
+            imported boolean NOT NULL DEFAULT false
+        ) ON COMMIT DROP
+    """,
+    'books': """
+        CREATE TEMP TABLE import_books (
+            line bigint PRIMARY KEY,
+            title text NOT NULL,
+            year integer NOT NULL,
+            author text NOT NULL,
+            imported boolean NOT NULL DEFAULT false
+        ) ON COMMIT DROP
+    """,
+}
+
+COPY = {
+    'authors': 'COPY import_authors (line, name) FROM STDIN',
+    'books': 'COPY import_books (line, title, year, author) FROM STDIN',
+}
+
+# The first row of each name/title in the file is inserted unless the
+# catalog already has it, every other row stays ``imported = false``.
+MERGE = {
+    'authors': """
+        WITH ranked AS (
+            SELECT line, name, row_number() OVER (
+                PARTITION BY name ORDER BY line
+            ) AS position
+            FROM import_authors
+        ), inserted AS (
+            INSERT INTO authors (name)
+            SELECT name FROM ranked WHERE position = 1 ORDER BY line
+            ON CONFLICT (name) DO NOTHING
+            RETURNING name
+        )
+        UPDATE import_authors AS staged SET imported = true
+        FROM ranked JOIN inserted USING (name)
+        WHERE ranked.position = 1 AND staged.line = ranked.line
+    """,
+    'books': """
+        WITH ranked AS (
+            SELECT staged.line, staged.title, staged.year,
+                authors.id AS author_id,
+                row_number() OVER (
+                    PARTITION BY staged.title ORDER BY staged.line
+                ) AS position
+            FROM import_books AS staged
+            JOIN authors ON authors.name = staged.author
+        ), inserted AS (
+            INSERT INTO books (title, year, author_id)
+            SELECT title, year, author_id FROM ranked
+            WHERE position = 1 ORDER BY line
+            ON CONFLICT (title) DO NOTHING
+            RETURNING title
+        )
+        UPDATE import_books AS staged SET imported = true
+        FROM ranked JOIN inserted USING (title)
+        WHERE ranked.position = 1 AND staged.line = ranked.line
+    """,
+}
+
+REJECTED = {
+    'authors': """
+        SELECT line, 'name already exists', name
+        FROM import_authors WHERE NOT imported ORDER BY line
+    """,
+    'books': """
+        SELECT staged.line,
+            CASE WHEN authors.id IS NULL THEN 'unknown author'
+                ELSE 'title already exists' END,
+            staged.title
+        FROM import_books AS staged
+        LEFT JOIN authors ON authors.name = staged.author
+        WHERE NOT staged.imported ORDER BY staged.line
+    """,
+}
+
+
+@dataclass
+class ImportSummary:
+    imported: int = 0
+    rejected: int = 0
+
+
+def _records(lines: list[str], fmt: Format, header: list[str] | None):
+    if fmt == 'ndjson':
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield line
+        return
+
+    for values in csv.reader(lines):
+        yield dict(zip(header, values, strict=False))
+
+
+async def read_records(
+    chunks: AsyncIterator[bytes], fmt: Format
+) -> AsyncIterator[tuple[int, dict | str]]:
+    """Yield ``(line, record)`` from a byte stream, one chunk at a time.
+
+    CSV files start with a header row and must hold one record per line.
+    Lines that are not valid JSON are yielded as raw strings.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    header = None
+    line_number = 0
+
+    async def complete_lines() -> AsyncIterator[list[str]]:
+        nonlocal pending
+
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split('\n')
+            yield lines
+
+        pending += decoder.decode(b'', final=True)
+        yield pending.split('\n')
+
+    async for chunk_lines in complete_lines():
+        lines = [line.rstrip('\r') for line in chunk_lines if line.strip()]
+
+        if fmt == 'csv' and header is None and lines:
+            header = next(csv.reader(lines[:1]))
+            lines = lines[1:]
+
+        for record in _records(lines, fmt, header):
+            line_number += 1
+            yield line_number, record
+
+
+def _staged_row(kind: Kind, line: int, record: BaseModel) -> tuple:
+    if kind == 'authors':
+        return line, record.name
+
+    return line, record.title, record.year, record.author
+
+
+async def import_catalog(
+    session: AsyncSession,
+    kind: Kind,
+    fmt: Format,
+    chunks: AsyncIterator[bytes],
+    rejects: IO[str],
+) -> ImportSummary:
+    """Load a CSV/NDJSON stream of authors or books through ``COPY``.
+
+    Rows are validated with the API schemas and streamed into a temporary
+    staging table, then merged into the catalog with a single statement.
+    Invalid rows and name/title collisions are written to ``rejects`` as
+    CSV, so memory use does not depend on the size of the input.
+    """
+    summary = ImportSummary()
+    writer = csv.writer(rejects)
+    writer.writerow(['line', 'reason', 'value'])
+
+    await session.execute(text(STAGING[kind]))
+
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    async with driver_connection.cursor() as cursor:
+        async with cursor.copy(COPY[kind]) as copy:
+            async for line, record in read_records(chunks, fmt):
+                try:
+                    validated = SCHEMAS[kind].model_validate(record)
+                except ValidationError:
+                    summary.rejected += 1
+                    writer.writerow([line, 'invalid row', json.dumps(record)])
+                    continue
+
+                await copy.write_row(_staged_row(kind, line, validated))
+
+    merged = await session.execute(text(MERGE[kind]))
+    summary.imported = merged.rowcount
+
+    rejected = await session.stream(text(REJECTED[kind]))
+    async for row in rejected:
+        summary.rejected += 1
+        writer.writerow(row)
+
+    await session.commit()
+
+    return summary
+
+
+async def iter_file(
+    file: IO[bytes], size: int = 64 * 1024
+) -> AsyncIterator[bytes]:
+    while chunk := file.read(size):
+        yield chunk
+
+
+def spooled_rejects() -> IO[str]:
+    """Text file for the rejects report, kept in memory while it is small."""
+    return io.TextIOWrapper(
+        tempfile.SpooledTemporaryFile(max_size=1024 * 1024),
+        encoding='utf-8',
+        newline='',
+    )
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+import psycopg
+from sqlalchemy import URL
+
+from madr import security
+from madr.cache import TTLCache
+from madr.database import engine
+from madr.routes.authors import author_responses
+from madr.routes.books import book_responses
+from madr.settings import Settings
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+# Notified by the triggers declared in ``madr.models``.
+CHANNEL = 'cache_invalidation'
+RETRY_MIN_SECONDS = 0.5
+
+Handler = Callable[[dict[str, Any]], None]
+Resync = Callable[[psycopg.AsyncConnection], Awaitable[None]]
+
+
+def conninfo(url: URL) -> str:
+    """libpq connection string for the SQLAlchemy ``url``."""
+    return url.set(drivername='postgresql').render_as_string(
+        hide_password=False
+    )
+
+
+class InvalidationListener:
+    """Evicts what other processes changed from the local caches.
+
+    Triggers ``NOTIFY`` every update or delete of users, authors and books
+    and the payload is handed to the handler of its table. Notifications
+    sent while disconnected are lost, so ``caches`` are cleared and
+    ``resync`` recovers what cannot simply be dropped each time the
+    listener (re)connects. ``synced`` is only set while connected and
+    caught up. An idle connection is probed every ``heartbeat`` seconds,
+    bounding how long a dead one goes unnoticed, and reconnections back
+    off exponentially up to ``retry_max`` seconds.
+    """
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        conninfo: str,
+        handlers: dict[str, Handler],
+        caches: Iterable[TTLCache],
+        heartbeat: float,
+        retry_max: float,
+        resync: Resync | None = None,
+        synced: asyncio.Event | None = None,
+    ):
+        self.conninfo = conninfo
+        self.handlers = handlers
+        self.caches = list(caches)
+        self.heartbeat = heartbeat
+        self.retry_max = retry_max
+        self.resync = resync
+        self.synced = synced or asyncio.Event()
+        self.connections = 0
+
+    def dispatch(self, payload: str):
+        try:
+            event = json.loads(payload)
+            handler = self.handlers[event['table']]
+        except (ValueError, KeyError, TypeError):
+            return
+
+        handler(event)
+
+    def _on_notify(self, notify: psycopg.Notify):
+        self.dispatch(notify.payload)
+
+    async def _subscribe(self, conn: psycopg.AsyncConnection):
+        # Notifications arriving while a query runs never reach
+        # ``notifies()``, only the connection handlers.
+        conn.add_notify_handler(self._on_notify)
+        await conn.execute(f'LISTEN {CHANNEL}')
+
+        for cache in self.caches:
+            cache.clear()
+        if self.resync:
+            await self.resync(conn)
+
+        self.connections += 1
+        self.synced.set()
+
+    async def _listen(self, conn: psycopg.AsyncConnection):
+        await self._subscribe(conn)
+
+        while True:
+            async for notify in conn.notifies(timeout=self.heartbeat):
+                self._on_notify(notify)
+
+            await conn.execute('SELECT 1')
+
+    async def run(self):
+        delay = RETRY_MIN_SECONDS
+        self.synced.clear()
+
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self.conninfo, autocommit=True
+                ) as conn:
+                    delay = RETRY_MIN_SECONDS
+                    await self._listen(conn)
+            except (psycopg.Error, OSError) as exc:
+                logger.warning(
+                    'Cache invalidation listener disconnected, retrying '
+                    'in %.1fs: %s',
+                    delay,
+                    exc,
+                )
+            finally:
+                self.synced.clear()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_max)
+
+
+def _evict_user(event: dict[str, Any]):
+    security.invalidate_principal(event['email'])
+    security.revoke_tokens(event['id'], event['token_version'])
+
+
+async def reload_revocations(conn: psycopg.AsyncConnection):
+    """Revoke the tokens of users changed or deleted within a token
+    lifetime, as their notifications may have been missed.
+
+    Tombstones older than that revoke nothing anymore and are dropped.
+    """
+    lifetime = [settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES]
+    await conn.execute(
+        'DELETE FROM user_tombstones '
+        'WHERE deleted_at <= now() - make_interval(mins => %s)',
+        lifetime,
+    )
+    cursor = await conn.execute(
+        'SELECT id, token_version FROM users '
+        'WHERE updated_at > now() - make_interval(mins => %s) '
+        'UNION ALL '
+        'SELECT id, token_version FROM user_tombstones',
+        lifetime,
+    )
+
+    async for user_id, token_version in cursor:
+        security.revoke_tokens(user_id, token_version)
+
+
+listener = InvalidationListener(
+    conninfo(engine.url),
+    handlers={
+        'users': _evict_user,
+        'authors': lambda event: author_responses.pop(event['id']),
+        'books': lambda event: book_responses.pop(event['id']),
+    },
+    caches=[security.principal_cache, author_responses, book_responses],
+    heartbeat=settings.CACHE_INVALIDATION_HEARTBEAT_SECONDS,
+    retry_max=settings.CACHE_INVALIDATION_RETRY_MAX_SECONDS,
+    resync=reload_revocations,
+    synced=security.revocations_synced,
+)
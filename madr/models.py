@@ -1,12 +1,38 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import DDL, ForeignKey, Index, event, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
-from zoneinfo import ZoneInfo
 
 table_registry = registry()
 
 
+def on_postgresql(event_name: str, *statements: str):
+    """Run raw DDL around ``create_all`` for what models cannot declare.
+
+    Migrations ship the same statements for existing databases.
+    """
+    for statement in statements:
+        event.listen(
+            table_registry.metadata,
+            event_name,
+            DDL(statement).execute_if(dialect='postgresql'),
+        )
+
+
+on_postgresql('before_create', 'CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+
+def trigram_index(name: str, column: str) -> Index:
+    """GIN trigram index serving ``LIKE '%value%'`` filters on ``column``."""
+    return Index(
+        name,
+        column,
+        postgresql_using='gin',
+        postgresql_ops={column: 'gin_trgm_ops'},
+    )
+
+
 class BaseModel:
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     created_at: Mapped[datetime] = mapped_column(
@@ -15,7 +41,7 @@ class BaseModel:
     updated_at: Mapped[datetime] = mapped_column(
         init=False,
         server_default=func.now(),
-        onupdate=datetime.now(tz=ZoneInfo('UTC')),
+        onupdate=func.now(),
         nullable=False,
     )
 
@@ -27,13 +53,39 @@ class User(BaseModel):
     username: Mapped[str] = mapped_column(unique=True)
     password: Mapped[str]
     email: Mapped[str] = mapped_column(unique=True)
+    token_version: Mapped[int] = mapped_column(
+        init=False, default=0, server_default='0'
+    )
+
+
+@table_registry.mapped_as_dataclass
+class UserTombstone:
+    """Deleted users, kept a token lifetime so every worker can still
+    revoke their tokens after missing the notification."""
+
+    __tablename__ = 'user_tombstones'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    token_version: Mapped[int]
+    deleted_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now(), nullable=False, index=True
+    )
 
 
 @table_registry.mapped_as_dataclass
 class Author(BaseModel):
     __tablename__ = 'authors'
+    __table_args__ = (
+        trigram_index('ix_authors_name_trgm', 'name'),
+        Index('ix_authors_name_id', 'name', 'id'),
+        Index('ix_authors_book_count_id', 'book_count', 'id'),
+    )
 
     name: Mapped[str] = mapped_column(unique=True)
+    # Maintained by the triggers on books below.
+    book_count: Mapped[int] = mapped_column(
+        init=False, default=0, server_default='0'
+    )
 
     books: Mapped[list['Book']] = relationship(
         init=False, back_populates='author'
@@ -43,10 +95,184 @@ class Author(BaseModel):
 @table_registry.mapped_as_dataclass
 class Book(BaseModel):
     __tablename__ = 'books'
+    __table_args__ = (
+        trigram_index('ix_books_title_trgm', 'title'),
+        Index('ix_books_title_id', 'title', 'id'),
+        Index('ix_books_year_id', 'year', 'id'),
+        Index(
+            'ix_books_search_vector', 'search_vector', postgresql_using='gin'
+        ),
+    )
 
     year: Mapped[int]
     title: Mapped[str] = mapped_column(unique=True)
 
-    author_id: Mapped[int] = mapped_column(ForeignKey('authors.id'))
+    author_id: Mapped[int] = mapped_column(
+        ForeignKey('authors.id'), index=True
+    )
 
     author: Mapped[Author] = relationship(init=False, back_populates='books')
+
+    # Title, author name and year, maintained by the triggers below.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, init=False, deferred=True
+    )
+
+
+on_postgresql(
+    'after_create',
+    """
+    CREATE OR REPLACE FUNCTION books_search_vector_update() RETURNS trigger
+    AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', NEW.title), 'A')
+            || setweight(to_tsvector('simple', coalesce(
+                (SELECT name FROM authors WHERE id = NEW.author_id), ''
+            )), 'B')
+            || setweight(to_tsvector('simple', NEW.year::text), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER books_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, year, author_id ON books
+    FOR EACH ROW EXECUTE FUNCTION books_search_vector_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION authors_search_vector_update() RETURNS trigger
+    AS $$
+    BEGIN
+        UPDATE books SET title = title WHERE author_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER authors_search_vector_update
+    AFTER UPDATE OF name ON authors
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION authors_search_vector_update()
+    """,
+)
+
+on_postgresql(
+    'after_create',
+    """
+    CREATE OR REPLACE FUNCTION authors_book_count_update() RETURNS trigger
+    AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE authors SET book_count = book_count + added.books
+            FROM (
+                SELECT author_id, count(*) AS books FROM new_books
+                GROUP BY author_id
+            ) AS added
+            WHERE authors.id = added.author_id;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE authors SET book_count = book_count - removed.books
+            FROM (
+                SELECT author_id, count(*) AS books FROM old_books
+                GROUP BY author_id
+            ) AS removed
+            WHERE authors.id = removed.author_id;
+        ELSE
+            UPDATE authors SET book_count = book_count + moved.books
+            FROM (
+                SELECT author_id, sum(books) AS books FROM (
+                    SELECT author_id, 1 AS books FROM new_books
+                    UNION ALL
+                    SELECT author_id, -1 FROM old_books
+                ) AS changes
+                GROUP BY author_id HAVING sum(books) <> 0
+            ) AS moved
+            WHERE authors.id = moved.author_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    # Statement level, so a bulk insert or import updates each author once.
+    """
+    CREATE TRIGGER books_book_count_insert
+    AFTER INSERT ON books REFERENCING NEW TABLE AS new_books
+    FOR EACH STATEMENT EXECUTE FUNCTION authors_book_count_update()
+    """,
+    """
+    CREATE TRIGGER books_book_count_delete
+    AFTER DELETE ON books REFERENCING OLD TABLE AS old_books
+    FOR EACH STATEMENT EXECUTE FUNCTION authors_book_count_update()
+    """,
+    """
+    CREATE TRIGGER books_book_count_update
+    AFTER UPDATE ON books
+    REFERENCING OLD TABLE AS old_books NEW TABLE AS new_books
+    FOR EACH STATEMENT EXECUTE FUNCTION authors_book_count_update()
+    """,
+)
+
+on_postgresql(
+    'after_create',
+    """
+    CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger
+    AS $$
+    BEGIN
+        PERFORM pg_notify('cache_invalidation', json_build_object(
+            'table', TG_TABLE_NAME, 'id', OLD.id
+        )::text);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    # Cached principals are keyed by email and deletes revoke tokens too.
+    """
+    CREATE OR REPLACE FUNCTION notify_user_invalidation() RETURNS trigger
+    AS $$
+    BEGIN
+        PERFORM pg_notify('cache_invalidation', json_build_object(
+            'table', TG_TABLE_NAME,
+            'id', OLD.id,
+            'email', OLD.email,
+            'token_version', CASE TG_OP
+                WHEN 'DELETE' THEN OLD.token_version + 1
+                ELSE NEW.token_version
+            END
+        )::text);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER users_cache_invalidation
+    AFTER UPDATE OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION notify_user_invalidation()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION record_user_tombstone() RETURNS trigger
+    AS $$
+    BEGIN
+        INSERT INTO user_tombstones (id, token_version)
+        VALUES (OLD.id, OLD.token_version + 1)
+        ON CONFLICT (id) DO UPDATE
+        SET token_version = EXCLUDED.token_version, deleted_at = now();
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER users_tombstone
+    AFTER DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION record_user_tombstone()
+    """,
+    """
+    CREATE TRIGGER authors_cache_invalidation
+    AFTER UPDATE OR DELETE ON authors
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation()
+    """,
+    """
+    CREATE TRIGGER books_cache_invalidation
+    AFTER UPDATE OR DELETE ON books
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation()
+    """,
+)
@@ -0,0 +1,139 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from http import HTTPStatus
+from typing import Annotated, Any
+
+import orjson
+from fastapi import HTTPException, Query
+from sqlalchemy import Row, Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from madr.settings import Settings
+
+settings = Settings()
+
+T_Offset = Annotated[int, Query(ge=0, le=settings.PAGINATION_MAX_OFFSET)]
+T_Limit = Annotated[int, Query(ge=1, le=settings.PAGINATION_MAX_LIMIT)]
+
+Keys = Sequence[InstrumentedAttribute]
+
+
+def encode_cursor(keys: Keys, values: Sequence[Any]) -> str:
+    payload = json.dumps([[key.key for key in keys], list(values)])
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(keys: Keys, cursor: str) -> list[Any]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        names, values = json.loads(base64.urlsafe_b64decode(padded))
+        valid = names == [key.key for key in keys] and all(
+            isinstance(value, key.type.python_type)
+            for key, value in zip(keys, values, strict=True)
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        valid = False
+
+    if not valid:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+        )
+
+    return values
+
+
+def paginate(  # noqa: PLR0913
+    query: Select,
+    keys: Keys,
+    cursor: str | None,
+    offset: int,
+    limit: int,
+    *,
+    descending: bool = False,
+) -> Select:
+    """Order ``query`` by ``keys`` and select the page after ``cursor``.
+
+    Without a cursor the legacy ``offset`` is applied instead. One extra
+    row is fetched so ``next_page`` can tell whether another page exists.
+    """
+    if descending:
+        query = query.order_by(*(key.desc() for key in keys))
+    else:
+        query = query.order_by(*keys)
+
+    if cursor:
+        values = decode_cursor(keys, cursor)
+        if descending:
+            query = query.where(tuple_(*keys) < tuple_(*values))
+        else:
+            query = query.where(tuple_(*keys) > tuple_(*values))
+    else:
+        query = query.offset(offset)
+
+    return query.limit(limit + 1)
+
+
+def next_page(rows: Sequence, keys: Keys, limit: int):
+    """Split the rows fetched by ``paginate`` into a page and its cursor."""
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[:limit]
+    last = page[-1]
+
+    return page, encode_cursor(keys, [getattr(last, key.key) for key in keys])
+
+
+def parse_fields(fields: str | None, allowed: Sequence[str]) -> list[str]:
+    """Names listed in the comma separated ``fields``, in ``allowed`` order.
+
+    Without ``fields`` every allowed name is returned.
+    """
+    if fields is None:
+        return list(allowed)
+
+    requested = {field.strip() for field in fields.split(',')}
+    if not requested <= set(allowed):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail='Invalid fields'
+        )
+
+    return [field for field in allowed if field in requested]
+
+
+def projection(
+    columns: Sequence[InstrumentedAttribute],
+    fields: Sequence[str],
+    *required: InstrumentedAttribute,
+) -> list[InstrumentedAttribute]:
+    """The ``columns`` named in ``fields``, followed by the ``required``
+    ones not already selected, such as cursor keys."""
+    selected = [column for column in columns if column.key in fields]
+    names = {column.key for column in selected}
+
+    for column in required:
+        if column.key not in names:
+            selected.append(column)
+            names.add(column.key)
+
+    return selected
+
+
+def page_json(
+    name: str,
+    rows: Sequence[Row],
+    fields: Sequence[str],
+    next_cursor: str | None,
+) -> bytes:
+    """Serialize a page straight from its row tuples, skipping validation.
+
+    The leading columns of each row are the exposed ``fields``, any
+    trailing ones only feed the cursor or the validators.
+    """
+    return orjson.dumps({
+        name: [dict(zip(fields, row)) for row in rows],
+        'next_cursor': next_cursor,
+    })
@@ -1,13 +1,14 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.routing import APIRouter
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from madr import security
+from madr.admission import login_admission
 from madr.database import get_session
 from madr.models import User
 from madr.schemas import Token
@@ -17,33 +18,48 @@ router = APIRouter(prefix='/auth', tags=['Authorization'])
 
 T_FormData = Annotated[OAuth2PasswordRequestForm, Depends()]
 T_Session = Annotated[AsyncSession, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(security.get_current_user)]
+T_CurrentPrincipal = Annotated[
+    security.Principal, Depends(security.get_current_principal)
+]
 
 
 @router.post('/token', response_model=Token)
-async def login_for_token(session: T_Session, form_data: T_FormData):
-    user = await session.scalar(
-        select(User).where(User.email == form_data.username)
-    )
-
-    if not user or not security.verify_password(
-        form_data.password, user.password
-    ):
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail='Incorrect email or password',
+async def login_for_token(
+    request: Request, session: T_Session, form_data: T_FormData
+):
+    ip = request.client.host if request.client else ''
+    async with login_admission.admit(form_data.username, ip):
+        user = await session.scalar(
+            select(User).where(User.email == form_data.username)
         )
+        # Hand the connection back to the pool while Argon2 runs.
+        await session.commit()
+
+        valid, updated_hash = False, None
+        if user:
+            valid, updated_hash = await security.verify_and_update_async(
+                form_data.password, user.password
+            )
 
-    data = {'sub': user.email}
-    access_token = security.create_access_token(data)
+        if not valid:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail='Incorrect email or password',
+            )
+
+        if updated_hash:
+            user.password = updated_hash
+            await session.commit()
+
+    access_token = security.create_access_token(security.token_claims(user))
 
     return Token(access_token=access_token, token_type='Bearer')
 
 
 @router.post('/refresh_token', response_model=Token)
-def refresh_token(current_user: T_CurrentUser):
-    new_access_token = security.create_access_token({
-        'sub': current_user.email
-    })
+def refresh_token(principal: T_CurrentPrincipal):
+    new_access_token = security.create_access_token(
+        security.token_claims(principal)
+    )
 
     return {'access_token': new_access_token, 'token_type': 'Bearer'}
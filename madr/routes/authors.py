@@ -1,35 +1,82 @@
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.routing import APIRouter
-from sqlalchemy import select
+from sqlalchemy import Select, delete, func, select, update
+from sqlalchemy.dialects.postgresql import (
+    aggregate_order_by,
+    array_agg,
+    insert,
+)
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from madr import security
-from madr.database import get_session
-from madr.models import Author, User
-from madr.schemas import AuthorList, AuthorPublic, AuthorSchema, MessageSchema
+from madr import bulk, conditional, export, security
+from madr.cache import TTLCache
+from madr.database import (
+    get_read_engine,
+    get_read_session,
+    get_session,
+    read_router,
+)
+from madr.models import Author, Book
+from madr.pagination import (
+    T_Limit,
+    T_Offset,
+    next_page,
+    page_json,
+    paginate,
+    parse_fields,
+    projection,
+)
+from madr.schemas import (
+    AuthorBulkSchema,
+    AuthorDetail,
+    AuthorList,
+    AuthorPublic,
+    AuthorSchema,
+    AuthorStats,
+    BulkResult,
+    MessageSchema,
+    sanitize_name,
+)
+from madr.settings import Settings
 
 router = APIRouter(prefix='/authors', tags=['Authors'])
 
 
 T_Session = Annotated[AsyncSession, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(security.get_current_user)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+T_ReadEngine = Annotated[AsyncEngine, Depends(get_read_engine)]
+T_CurrentPrincipal = Annotated[
+    security.Principal, Depends(security.get_current_principal)
+]
+
+settings = Settings()
+
+# Serialized ``get_author`` bodies, dropped by the writes changing them.
+# Only filled from the primary, as replicas may still serve a dropped row,
+# and skipped for clients pinned to the primary after a write.
+author_responses = TTLCache(
+    'author_responses',
+    maxsize=settings.AUTHOR_RESPONSE_CACHE_SIZE,
+    ttl=settings.AUTHOR_RESPONSE_CACHE_TTL_SECONDS,
+)
 
 
 @router.post('/', response_model=AuthorPublic, status_code=HTTPStatus.CREATED)
 async def create_author(
-    session: T_Session, author: AuthorSchema, current_user: T_CurrentUser
+    session: T_Session, author: AuthorSchema, _: T_CurrentPrincipal
 ):
-    author_db = Author(**author.model_dump())
-
     try:
-        session.add(author_db)
+        author_db = await session.scalar(
+            insert(Author).values(**author.model_dump()).returning(Author)
+        )
         await session.commit()
-        await session.refresh(author_db)
     except IntegrityError:
+        await session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT, detail='Author already exists'
         )
@@ -37,19 +84,101 @@ async def create_author(
     return author_db
 
 
+def _upsert(rows: list[dict]):
+    """Insert ``rows``, leaving existing names as they are.
+
+    Updating the name to itself makes ``RETURNING`` report existing rows.
+    """
+    statement = insert(Author).values(rows)
+
+    return statement.on_conflict_do_update(
+        index_elements=[Author.name], set_={'name': statement.excluded.name}
+    )
+
+
+@router.put('/by-name/{name}', response_model=AuthorPublic)
+async def upsert_author(
+    session: T_Session, name: str, response: Response, _: T_CurrentPrincipal
+):
+    result = await session.execute(
+        _upsert([{'name': sanitize_name(name)}])
+        .returning(Author, bulk.INSERTED)
+        .execution_options(populate_existing=True)
+    )
+    author_db, inserted = result.one()
+    await session.commit()
+    author_responses.pop(author_db.id)
+
+    if inserted:
+        response.status_code = HTTPStatus.CREATED
+
+    return author_db
+
+
+@router.put('/bulk', response_model=BulkResult)
+async def upsert_authors(
+    session: T_Session, payload: AuthorBulkSchema, _: T_CurrentPrincipal
+):
+    rows = [author.model_dump() for author in payload.authors]
+
+    upserted = {}
+    for chunk in bulk.chunked(bulk.latest_by(rows, 'name')):
+        result = await session.execute(
+            _upsert(chunk).returning(Author.name, Author.id, bulk.INSERTED)
+        )
+        upserted.update(
+            (name, (author_id, inserted))
+            for name, author_id, inserted in result.tuples()
+        )
+
+    await session.commit()
+
+    for author_id, _inserted in upserted.values():
+        author_responses.pop(author_id)
+
+    return {
+        'results': bulk.upsert_outcomes(
+            [row['name'] for row in rows], upserted
+        )
+    }
+
+
+@router.post('/bulk', response_model=BulkResult)
+async def create_authors(
+    session: T_Session, payload: AuthorBulkSchema, _: T_CurrentPrincipal
+):
+    rows = [author.model_dump() for author in payload.authors]
+
+    created = {}
+    for chunk in bulk.chunked(rows):
+        inserted = await session.execute(
+            insert(Author)
+            .values(chunk)
+            .on_conflict_do_nothing()
+            .returning(Author.name, Author.id)
+        )
+        created.update(inserted.tuples().all())
+
+    await session.commit()
+
+    return {'results': bulk.outcomes([row['name'] for row in rows], created)}
+
+
 @router.delete('/{author_id}', response_model=MessageSchema)
 async def delete_author(
-    session: T_Session, author_id: int, current_user: T_CurrentUser
+    session: T_Session, author_id: int, _: T_CurrentPrincipal
 ):
-    author = await session.scalar(select(Author).where(Author.id == author_id))
+    author = await session.scalar(
+        delete(Author).where(Author.id == author_id).returning(Author.id)
+    )
 
     if not author:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Author does not exist'
         )
 
-    await session.delete(author)
     await session.commit()
+    author_responses.pop(author_id)
 
     return {'message': 'Author successfully removed'}
 
@@ -59,55 +188,172 @@ async def update_author(
     author_id: int,
     author: AuthorSchema,
     session: T_Session,
-    current_user: T_CurrentUser,
+    _: T_CurrentPrincipal,
 ):
-    author_db = await session.scalar(
-        select(Author).where(Author.id == author_id)
-    )
-
-    if not author_db:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Author does not exist'
-        )
-
-    author_db.name = author.name
     try:
-        session.add(author_db)
+        author_db = await session.scalar(
+            update(Author)
+            .where(Author.id == author_id)
+            .values(name=author.name)
+            .returning(Author)
+        )
         await session.commit()
-        await session.refresh(author_db)
     except IntegrityError:
+        await session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT, detail='Author already exists'
         )
 
+    if not author_db:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Author does not exist'
+        )
+
+    author_responses.pop(author_id)
+
     return author_db
 
 
-@router.get('/{author_id}', response_model=AuthorPublic)
-async def get_author(session: T_Session, author_id: int):
-    author_db = await session.scalar(
-        select(Author).where(Author.id == author_id)
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    responses={200: {'content': {'application/x-ndjson': {}}}},
+)
+async def export_authors(engine: T_ReadEngine):
+    query = select(Author.id, Author.name).order_by(Author.id)
+
+    return export.ndjson_response(engine, query)
+
+
+LATEST_TITLES = 5
+
+
+def _with_stats(query: Select) -> Select:
+    """Aggregate the books of each author selected by ``query``."""
+    latest_titles = array_agg(
+        aggregate_order_by(Book.title, Book.year.desc(), Book.id.desc())
+    ).filter(Book.id.is_not(None))
+
+    return (
+        query.add_columns(
+            func.count(Book.id).label('book_count'),
+            func.min(Book.year).label('first_year'),
+            func.max(Book.year).label('last_year'),
+            latest_titles[1:LATEST_TITLES].label('latest_titles'),
+        )
+        .outerjoin(Author.books)
+        .group_by(Author.id)
     )
 
-    if not author_db:
+
+@router.get('/{author_id}', response_model=AuthorPublic | AuthorDetail)
+async def get_author(
+    request: Request,
+    session: T_ReadSession,
+    author_id: int,
+    include: Literal['stats'] | None = None,
+):
+    # The session only checks out a connection on its first query.
+    cacheable = not include and not read_router.is_pinned(request)
+    if cacheable and (cached := author_responses.get(author_id)):
+        body, validators = cached
+        return conditional.json_response(request, validators, lambda: body)
+
+    # Read before the query, an update committed meanwhile bumps it.
+    generation = author_responses.generation(author_id)
+    query = select(Author).where(Author.id == author_id)
+    if include == 'stats':
+        query = _with_stats(query)
+
+    row = (await session.execute(query)).first()
+
+    if not row:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Author does not exist'
         )
 
-    return author_db
+    if include != 'stats':
+        validators = conditional.Validators.of('author', [row.Author])
+
+        def serialize():
+            author = AuthorPublic.model_validate(row.Author)
+            body = author.model_dump_json().encode()
+            if not read_router.is_replica(session.bind):
+                author_responses.set(
+                    author_id, (body, validators), generation=generation
+                )
+
+            return body
+
+        return conditional.json_response(request, validators, serialize)
+
+    # Stats change with the author's books, so they carry no validators.
+    return AuthorDetail(
+        id=row.Author.id,
+        name=row.Author.name,
+        stats=AuthorStats(
+            book_count=row.book_count,
+            first_year=row.first_year,
+            last_year=row.last_year,
+            latest_titles=row.latest_titles or [],
+        ),
+    )
+
+
+# Listed in the order of ``AuthorPublic`` so rows serialize as they come.
+AUTHOR_COLUMNS = (Author.name, Author.id)
+AUTHOR_FIELDS = [column.key for column in AUTHOR_COLUMNS]
+
+AUTHOR_ORDERINGS = {
+    'id': (Author.id,),
+    'name': (Author.name, Author.id),
+    'book_count': (Author.book_count, Author.id),
+}
+# Orderings listing the largest values first.
+DESCENDING_ORDERINGS = {'book_count'}
 
 
 @router.get('/', response_model=AuthorList)
-async def get_authors(
-    session: T_Session,
+async def get_authors(  # noqa: PLR0913, PLR0917
+    request: Request,
+    session: T_ReadSession,
     name: str | None = None,
-    offset: int | None = 0,
-    limit: int | None = 20,
+    order_by: Literal['id', 'name', 'book_count'] = 'id',
+    cursor: str | None = None,
+    offset: T_Offset = 0,
+    limit: T_Limit = 20,
+    fields: str | None = None,
 ):
-    query = select(Author)
+    keys = AUTHOR_ORDERINGS[order_by]
+    selected = parse_fields(fields, AUTHOR_FIELDS)
+
+    query = select(
+        *projection(
+            AUTHOR_COLUMNS, selected, Author.id, Author.updated_at, *keys
+        )
+    )
     if name:
-        query = query.filter(Author.name.contains(name))
+        query = query.filter(
+            Author.name.contains(sanitize_name(name), autoescape=True)
+        )
 
-    authors = await session.scalars(query.offset(offset).limit(limit))
+    authors = await session.execute(
+        paginate(
+            query,
+            keys,
+            cursor,
+            offset,
+            limit,
+            descending=order_by in DESCENDING_ORDERINGS,
+        )
+    )
+    authors, next_cursor = next_page(authors.all(), keys, limit)
+    validators = conditional.Validators.of(
+        f'authors?{request.url.query}|{next_cursor}', authors, dated=False
+    )
 
-    return {'authors': authors.all()}
+    return conditional.json_response(
+        request,
+        validators,
+        lambda: page_json('authors', authors, selected, next_cursor),
+    )
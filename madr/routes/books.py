@@ -1,40 +1,82 @@
+from collections.abc import Awaitable, Callable
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.routing import APIRouter
-from sqlalchemy import select
+from sqlalchemy import case, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
-from madr import security
-from madr.database import get_session
-from madr.models import Book, User
+from madr import bulk, conditional, export, security
+from madr.cache import TTLCache
+from madr.database import (
+    get_read_engine,
+    get_read_session,
+    get_session,
+    read_router,
+)
+from madr.models import Author, Book
+from madr.pagination import (
+    T_Limit,
+    T_Offset,
+    next_page,
+    page_json,
+    paginate,
+    parse_fields,
+    projection,
+)
 from madr.schemas import (
+    BookBulkSchema,
+    BookExpanded,
+    BookExpandedList,
     BookList,
     BookPublic,
     BookSchema,
     BookUpdateSchema,
+    BookUpsertSchema,
+    BulkResult,
     MessageSchema,
+    sanitize_name,
 )
+from madr.settings import Settings
 
 router = APIRouter(prefix='/books', tags=['Books'])
 
 T_Session = Annotated[AsyncSession, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(security.get_current_user)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+T_ReadEngine = Annotated[AsyncEngine, Depends(get_read_engine)]
+T_CurrentPrincipal = Annotated[
+    security.Principal, Depends(security.get_current_principal)
+]
+Expand = Literal['author'] | None
+
+settings = Settings()
+
+# Serialized ``get_book`` bodies, dropped by the writes changing them.
+# Only filled from the primary, as replicas may still serve a dropped row,
+# and skipped for clients pinned to the primary after a write.
+book_responses = TTLCache(
+    'book_responses',
+    maxsize=settings.BOOK_RESPONSE_CACHE_SIZE,
+    ttl=settings.BOOK_RESPONSE_CACHE_TTL_SECONDS,
+)
 
 
 @router.post('/', response_model=BookPublic, status_code=HTTPStatus.CREATED)
 async def create_book(
-    session: T_Session, book: BookSchema, _: T_CurrentUser
+    session: T_Session, book: BookSchema, _: T_CurrentPrincipal
 ):
-    book_db = Book(**book.model_dump())
-
     try:
-        session.add(book_db)
+        book_db = await session.scalar(
+            insert(Book).values(**book.model_dump()).returning(Book)
+        )
         await session.commit()
-        await session.refresh(book_db)
     except IntegrityError:
+        await session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT, detail='Book already exists'
         )
@@ -42,19 +84,179 @@ async def create_book(
     return book_db
 
 
+async def _unknown_authors(session: AsyncSession, rows: list[dict]) -> set:
+    """Indexes of the rows whose ``author_id`` does not exist."""
+    authors = await session.scalars(
+        select(Author.id).where(
+            Author.id.in_({row['author_id'] for row in rows})
+        )
+    )
+    known_authors = set(authors)
+
+    return {
+        index
+        for index, row in enumerate(rows)
+        if row['author_id'] not in known_authors
+    }
+
+
+def _upsert(rows: list[dict]):
+    """Insert ``rows`` or update the books with the same title.
+
+    ``updated_at`` only moves when the year or the author actually change.
+    """
+    statement = insert(Book).values(rows)
+    excluded = statement.excluded
+    changed = tuple_(Book.year, Book.author_id).is_distinct_from(
+        tuple_(excluded.year, excluded.author_id)
+    )
+
+    return statement.on_conflict_do_update(
+        index_elements=[Book.title],
+        set_={
+            'year': excluded.year,
+            'author_id': excluded.author_id,
+            'updated_at': case((changed, func.now()), else_=Book.updated_at),
+        },
+    )
+
+
+@router.put('/by-title/{title}', response_model=BookPublic)
+async def upsert_book(  # noqa: PLR0913, PLR0917
+    session: T_Session,
+    title: str,
+    book: BookUpsertSchema,
+    response: Response,
+    _: T_CurrentPrincipal,
+):
+    row = {**book.model_dump(), 'title': sanitize_name(title)}
+
+    try:
+        result = await session.execute(
+            _upsert([row])
+            .returning(Book, bulk.INSERTED)
+            .execution_options(populate_existing=True)
+        )
+        book_db, inserted = result.one()
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Author does not exist'
+        )
+
+    book_responses.pop(book_db.id)
+
+    if inserted:
+        response.status_code = HTTPStatus.CREATED
+
+    return book_db
+
+
+async def _write_known_authors(
+    session: AsyncSession,
+    rows: list[dict],
+    write: Callable[[list[dict]], Awaitable[dict]],
+) -> tuple[set[int], dict]:
+    """Commit ``write`` of the rows whose author exists, returning the
+    indexes of the others along with what it returned.
+
+    An author deleted after the check fails the INSERT on its foreign key,
+    the batch is then written again without the books of that author.
+    """
+    invalid = await _unknown_authors(session, rows)
+
+    while True:
+        valid_rows = [
+            row for index, row in enumerate(rows) if index not in invalid
+        ]
+        try:
+            written = await write(valid_rows)
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            rechecked = await _unknown_authors(session, rows)
+            if rechecked == invalid:
+                raise
+            invalid = rechecked
+        else:
+            return invalid, written
+
+
+@router.put('/bulk', response_model=BulkResult)
+async def upsert_books(
+    session: T_Session, payload: BookBulkSchema, _: T_CurrentPrincipal
+):
+    rows = [book.model_dump() for book in payload.books]
+
+    async def upsert(valid_rows: list[dict]) -> dict:
+        upserted = {}
+        for chunk in bulk.chunked(bulk.latest_by(valid_rows, 'title')):
+            result = await session.execute(
+                _upsert(chunk).returning(Book.title, Book.id, bulk.INSERTED)
+            )
+            upserted.update(
+                (title, (book_id, inserted))
+                for title, book_id, inserted in result.tuples()
+            )
+
+        return upserted
+
+    invalid, upserted = await _write_known_authors(session, rows, upsert)
+
+    for book_id, _inserted in upserted.values():
+        book_responses.pop(book_id)
+
+    return {
+        'results': bulk.upsert_outcomes(
+            [row['title'] for row in rows], upserted, invalid
+        )
+    }
+
+
+@router.post('/bulk', response_model=BulkResult)
+async def create_books(
+    session: T_Session, payload: BookBulkSchema, _: T_CurrentPrincipal
+):
+    rows = [book.model_dump() for book in payload.books]
+
+    async def create(valid_rows: list[dict]) -> dict:
+        created = {}
+        for chunk in bulk.chunked(valid_rows):
+            inserted = await session.execute(
+                insert(Book)
+                .values(chunk)
+                .on_conflict_do_nothing()
+                .returning(Book.title, Book.id)
+            )
+            created.update(inserted.tuples().all())
+
+        return created
+
+    invalid, created = await _write_known_authors(session, rows, create)
+
+    return {
+        'results': bulk.outcomes(
+            [row['title'] for row in rows], created, invalid
+        )
+    }
+
+
 @router.delete('/{book_id}', response_model=MessageSchema)
 async def delete_author(
-    session: T_Session, book_id: int, _: T_CurrentUser
+    session: T_Session, book_id: int, _: T_CurrentPrincipal
 ):
-    book = await session.scalar(select(Book).where(Book.id == book_id))
+    book = await session.scalar(
+        delete(Book).where(Book.id == book_id).returning(Book.id)
+    )
 
     if not book:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Book does not exist'
         )
 
-    await session.delete(book)
     await session.commit()
+    book_responses.pop(book_id)
 
     return {'message': 'Book successfully removed'}
 
@@ -64,57 +266,178 @@ async def update_book(
     book: BookUpdateSchema,
     book_id: int,
     session: T_Session,
-    _: T_CurrentUser,
+    _: T_CurrentPrincipal,
 ):
-    book_db = await session.scalar(select(Book).where(Book.id == book_id))
+    values = book.model_dump(exclude_unset=True)
+    query = select(Book).where(Book.id == book_id)
 
-    if not book_db:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Book does not exist'
+    if values:
+        query = (
+            update(Book)
+            .where(Book.id == book_id)
+            .values(**values)
+            .returning(Book)
         )
 
-    for key, value in book.model_dump(exclude_unset=True).items():
-        setattr(book_db, key, value)
-
     try:
-        session.add(book_db)
+        book_db = await session.scalar(query)
         await session.commit()
-        await session.refresh(book_db)
     except IntegrityError:
+        await session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT, detail='Book already exists'
         )
 
+    if not book_db:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Book does not exist'
+        )
+
+    book_responses.pop(book_id)
+
     return book_db
 
 
-@router.get('/{book_id}', response_model=BookPublic)
-async def get_book(book_id: int, session: T_Session):
-    book_db = await session.scalar(select(Book).where(Book.id == book_id))
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    responses={200: {'content': {'application/x-ndjson': {}}}},
+)
+async def export_books(engine: T_ReadEngine):
+    query = select(Book.id, Book.title, Book.year, Book.author_id).order_by(
+        Book.id
+    )
+
+    return export.ndjson_response(engine, query)
+
+
+@router.get('/{book_id}', response_model=BookPublic | BookExpanded)
+async def get_book(
+    request: Request,
+    book_id: int,
+    session: T_ReadSession,
+    expand: Expand = None,
+):
+    # The session only checks out a connection on its first query.
+    cacheable = not expand and not read_router.is_pinned(request)
+    if cacheable and (cached := book_responses.get(book_id)):
+        body, validators = cached
+        return conditional.json_response(request, validators, lambda: body)
+
+    # Read before the query, an update committed meanwhile bumps it.
+    generation = book_responses.generation(book_id)
+    query = select(Book).where(Book.id == book_id)
+    if expand:
+        query = query.options(joinedload(Book.author))
+
+    book_db = await session.scalar(query)
 
     if not book_db:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Book does not exist'
         )
 
-    return book_db
+    # Validated here so the unexpanded author is never read, which would
+    # lazy load it.
+    if expand:
+        validators = conditional.Validators.of(
+            'book?expand=author', [book_db], [book_db.author]
+        )
 
+        return conditional.json_response(
+            request,
+            validators,
+            lambda: BookExpanded.model_validate(book_db)
+            .model_dump_json()
+            .encode(),
+        )
 
-@router.get('/', response_model=BookList)
-async def get_books(
-    session: T_Session,
+    validators = conditional.Validators.of('book', [book_db])
+
+    def serialize():
+        body = BookPublic.model_validate(book_db).model_dump_json().encode()
+        if not read_router.is_replica(session.bind):
+            book_responses.set(
+                book_id, (body, validators), generation=generation
+            )
+
+        return body
+
+    return conditional.json_response(request, validators, serialize)
+
+
+# Listed in the order of ``BookPublic`` so rows serialize as they come.
+BOOK_COLUMNS = (Book.year, Book.title, Book.author_id, Book.id)
+BOOK_FIELDS = [column.key for column in BOOK_COLUMNS]
+
+BOOK_ORDERINGS = {
+    'id': (Book.id,),
+    'title': (Book.title, Book.id),
+    'year': (Book.year, Book.id),
+}
+
+
+@router.get('/', response_model=BookList | BookExpandedList)
+async def get_books(  # noqa: PLR0913, PLR0917
+    request: Request,
+    session: T_ReadSession,
     title: str | None = None,
     year: int | None = None,
-    offset: int | None = 0,
-    limit: int | None = 20,
+    order_by: Literal['id', 'title', 'year'] = 'id',
+    cursor: str | None = None,
+    offset: T_Offset = 0,
+    limit: T_Limit = 20,
+    expand: Expand = None,
+    fields: str | None = None,
 ):
-    query = select(Book)
+    keys = BOOK_ORDERINGS[order_by]
+    selected = parse_fields(fields, BOOK_FIELDS)
+
+    if expand:
+        query = select(Book).options(selectinload(Book.author))
+    else:
+        query = select(
+            *projection(
+                BOOK_COLUMNS, selected, Book.id, Book.updated_at, *keys
+            )
+        )
+
     if title:
-        query = query.filter(Book.title.contains(title))
+        query = query.filter(
+            Book.title.contains(sanitize_name(title), autoescape=True)
+        )
 
     if year:
         query = query.filter(Book.year == year)
 
-    books = await session.scalars(query.offset(offset).limit(limit))
+    page = paginate(query, keys, cursor, offset, limit)
+    rows = await (session.scalars(page) if expand else session.execute(page))
+    books, next_cursor = next_page(rows.all(), keys, limit)
+    variant = f'books?{request.url.query}|{next_cursor}'
+
+    if not expand:
+        return conditional.json_response(
+            request,
+            conditional.Validators.of(variant, books, dated=False),
+            lambda: page_json('books', books, selected, next_cursor),
+        )
 
-    return {'books': books.all()}
+    validators = conditional.Validators.of(
+        variant, books, [book.author for book in books], dated=False
+    )
+
+    return conditional.json_response(
+        request,
+        validators,
+        lambda: BookExpandedList.model_validate({
+            'books': books,
+            'next_cursor': next_cursor,
+        })
+        .model_dump_json(
+            include={
+                'books': {'__all__': {*selected, 'author'}},
+                'next_cursor': True,
+            }
+        )
+        .encode(),
+    )
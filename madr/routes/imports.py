@@ -0,0 +1,48 @@
+from typing import Annotated
+
+from fastapi import Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRouter
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+
+from madr import importer, security
+from madr.database import get_session
+
+router = APIRouter(prefix='/import', tags=['Import'])
+
+T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_CurrentPrincipal = Annotated[
+    security.Principal, Depends(security.get_current_principal)
+]
+
+
+@router.post(
+    '/{kind}',
+    response_class=StreamingResponse,
+    responses={200: {'content': {'text/csv': {}}}},
+)
+async def import_catalog(
+    request: Request,
+    session: T_Session,
+    kind: importer.Kind,
+    _: T_CurrentPrincipal,
+    fmt: Annotated[importer.Format, Query(alias='format')] = 'csv',
+):
+    rejects = importer.spooled_rejects()
+    summary = await importer.import_catalog(
+        session, kind, fmt, request.stream(), rejects
+    )
+    rejects.seek(0)
+    filename = f'{kind}-rejects.csv'
+
+    return StreamingResponse(
+        rejects,
+        media_type='text/csv',
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Imported-Rows': str(summary.imported),
+            'X-Rejected-Rows': str(summary.rejected),
+        },
+        background=BackgroundTask(rejects.close),
+    )
@@ -0,0 +1,18 @@
+from fastapi.routing import APIRouter
+
+from madr.admission import login_admission
+from madr.cache import caches_stats
+from madr.database import engine, pool_stats, replica_engines
+from madr.schemas import MetricsSchema
+
+router = APIRouter(prefix='/metrics', tags=['Metrics'])
+
+
+@router.get('/', response_model=MetricsSchema)
+def get_metrics():
+    return {
+        'caches': caches_stats(),
+        'login': login_admission.stats(),
+        'database': pool_stats(engine),
+        'replicas': [pool_stats(replica) for replica in replica_engines],
+    }
@@ -0,0 +1,49 @@
+import re
+from typing import Annotated
+
+from fastapi import Depends, Query
+from fastapi.routing import APIRouter
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from madr.database import get_read_session
+from madr.models import Book
+from madr.pagination import T_Limit, T_Offset
+from madr.schemas import SearchList, sanitize_name
+
+router = APIRouter(prefix='/search', tags=['Search'])
+
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+
+
+def build_tsquery(text: str) -> str:
+    """Every word of ``text`` must prefix a word of the title, author or
+    year, so ``tolkien ring 1954`` matches "the lord of the rings"."""
+    words = re.findall(r'\w+', sanitize_name(text))
+
+    return ' & '.join(f'{word}:*' for word in words)
+
+
+@router.get('/', response_model=SearchList)
+async def search_books(
+    session: T_ReadSession,
+    q: Annotated[str, Query(min_length=1)],
+    offset: T_Offset = 0,
+    limit: T_Limit = 20,
+):
+    tsquery = build_tsquery(q)
+    if not tsquery:
+        return {'books': []}
+
+    ts_query = func.to_tsquery('simple', tsquery)
+    rank = func.ts_rank(Book.search_vector, ts_query).label('rank')
+
+    books = await session.execute(
+        select(Book.id, Book.year, Book.title, Book.author_id, rank)
+        .where(Book.search_vector.bool_op('@@')(ts_query))
+        .order_by(rank.desc(), Book.id)
+        .offset(offset)
+        .limit(limit)
+    )
+
+    return {'books': books.all()}
@@ -3,12 +3,12 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException
 from fastapi.routing import APIRouter
-from sqlalchemy import select
+from sqlalchemy import delete, insert, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from madr import security
-from madr.database import get_session
+from madr.database import get_session, violated_constraint
 from madr.models import User
 from madr.schemas import MessageSchema, UserPublic, UserSchema
 
@@ -20,29 +20,27 @@ T_CurrentUser = Annotated[User, Depends(security.get_current_user)]
 
 @router.post('/', response_model=UserPublic, status_code=HTTPStatus.CREATED)
 async def create_account(session: T_Session, user: UserSchema):
-    user_db = await session.scalar(
-        select(User).where(
-            (User.username == user.username) | (User.email == user.email)
-        )
-    )
+    password = await security.get_password_hash_async(user.password)
 
-    if user_db:
-        field = 'Username' if user_db.username == user.username else 'Email'
+    try:
+        user_db = await session.scalar(
+            insert(User)
+            .values(
+                username=user.username, email=user.email, password=password
+            )
+            .returning(User)
+        )
+        await session.commit()
+    except IntegrityError as exc:
+        await session.rollback()
+        field = (
+            'Username' if 'username' in violated_constraint(exc) else 'Email'
+        )
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail=f'{field} already exists',
         )
 
-    user_db = User(
-        username=user.username,
-        email=user.email,
-        password=security.get_password_hash(user.password),
-    )
-
-    session.add(user_db)
-    await session.commit()
-    await session.refresh(user_db)
-
     return user_db
 
 
@@ -58,20 +56,32 @@ async def update_user(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permission'
         )
 
-    current_user.username = user.username
-    current_user.email = user.email
-    current_user.password = security.get_password_hash(user.password)
+    previous_email = current_user.email
+    password = await security.get_password_hash_async(user.password)
 
     try:
-        session.add(current_user)
+        user_db = await session.scalar(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                username=user.username,
+                email=user.email,
+                password=password,
+                token_version=User.token_version + 1,
+            )
+            .returning(User)
+        )
         await session.commit()
-        await session.refresh(current_user)
     except IntegrityError:
+        await session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT, detail='Resource already exists'
         )
 
-    return current_user
+    security.invalidate_principal(previous_email)
+    security.revoke_tokens(user_db.id, user_db.token_version)
+
+    return user_db
 
 
 @router.delete('/{user_id}', response_model=MessageSchema)
@@ -83,7 +93,18 @@ async def delete_user(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permission'
         )
 
-    await session.delete(current_user)
+    token_version = await session.scalar(
+        delete(User).where(User.id == user_id).returning(User.token_version)
+    )
     await session.commit()
 
+    # A cached principal can outlive its row, deleted by another request.
+    if token_version is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='User does not exist'
+        )
+
+    security.invalidate_principal(current_user.email)
+    security.revoke_tokens(user_id, token_version + 1)
+
     return {'message': 'User successfully removed'}
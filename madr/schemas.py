@@ -1,13 +1,18 @@
 import string
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import (
     AfterValidator,
     BaseModel,
     ConfigDict,
     EmailStr,
+    Field,
 )
 
+from madr.settings import Settings
+
+settings = Settings()
+
 
 def sanitize_name(value: str):
     result = ' '.join(value.split())
@@ -47,8 +52,25 @@ class AuthorPublic(AuthorSchema):
     id: int
 
 
+class AuthorStats(BaseModel):
+    book_count: int
+    first_year: int | None
+    last_year: int | None
+    latest_titles: list[str]
+
+
+class AuthorDetail(AuthorPublic):
+    stats: AuthorStats
+
+
+class AuthorBulkSchema(BaseModel):
+    # Checked while validating, before the items past the limit.
+    authors: list[AuthorSchema] = Field(max_length=settings.BULK_MAX_ITEMS)
+
+
 class AuthorList(BaseModel):
     authors: list[AuthorPublic]
+    next_cursor: str | None = None
 
 
 class BookSchema(BaseModel):
@@ -62,8 +84,50 @@ class BookPublic(BookSchema):
     id: int
 
 
+class BookExpanded(BookPublic):
+    author: AuthorPublic
+
+
+class BookUpsertSchema(BaseModel):
+    year: int
+    author_id: int
+
+
+class BookImportSchema(BaseModel):
+    year: int
+    title: Annotated[str, AfterValidator(sanitize_name)]
+    author: Annotated[str, AfterValidator(sanitize_name)]
+
+
 class BookList(BaseModel):
     books: list[BookPublic]
+    next_cursor: str | None = None
+
+
+class BookExpandedList(BookList):
+    books: list[BookExpanded]
+
+
+class BookSearchResult(BookPublic):
+    rank: float
+
+
+class SearchList(BaseModel):
+    books: list[BookSearchResult]
+
+
+class BookBulkSchema(BaseModel):
+    books: list[BookSchema] = Field(max_length=settings.BULK_MAX_ITEMS)
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: Literal['created', 'updated', 'conflict', 'invalid_author']
+    id: int | None = None
+
+
+class BulkResult(BaseModel):
+    results: list[BulkItemResult]
 
 
 class BookUpdateSchema(BaseModel):
@@ -71,3 +135,35 @@ class BookUpdateSchema(BaseModel):
     title: Annotated[str, AfterValidator(sanitize_name)] | None = None
     author_id: int | None = None
     model_config = ConfigDict(from_attributes=True)
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class LoginAdmissionStats(BaseModel):
+    in_flight: int
+    max_in_flight: int
+    admitted: int
+    rejected: dict[str, int]
+
+
+class PoolStats(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class MetricsSchema(BaseModel):
+    caches: dict[str, CacheStats]
+    login: LoginAdmissionStats
+    database: PoolStats
+    replicas: list[PoolStats]
@@ -1,3 +1,10 @@
+import asyncio
+import hashlib
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from http import HTTPStatus
 from typing import Any
@@ -6,19 +13,53 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import PyJWTError, decode, encode
 from pwdlib import PasswordHash
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from pwdlib.hashers.argon2 import Argon2Hasher
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session, make_transient_to_detached
 from zoneinfo import ZoneInfo
 
+from madr.cache import TTLCache
 from madr.database import get_session
 from madr.models import User
 from madr.settings import Settings
 
-pwd_context = PasswordHash.recommended()
+settings = Settings()
+
+pwd_context = PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    ),
+))
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
 
+principal_cache = TTLCache(
+    'principals',
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+# Revocations only need to outlive the tokens they reject.
+token_revocations = TTLCache(
+    'token_revocations',
+    maxsize=settings.TOKEN_REVOCATION_CACHE_SIZE,
+    ttl=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+# Set by the invalidation listener while caught up with the revocations
+# made by other processes, never when it does not run.
+revocations_synced = asyncio.Event()
+
+
+def _epoch_time() -> float:
+    return time.time()
 
-settings = Settings()
+
+# Entries expire at the token ``exp`` claim, which is in epoch seconds.
+verified_token_cache = TTLCache(
+    'verified_tokens',
+    maxsize=settings.TOKEN_DECODE_CACHE_SIZE,
+    timer=_epoch_time,
+)
 
 
 def get_password_hash(password: str) -> str:
@@ -29,6 +70,92 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
 
 
+def verify_and_update_password(
+    password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify ``password``, also returning a new hash when the stored one
+    was produced with other Argon2 parameters than the configured ones."""
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class HashingPool:
+    """Bounded process pool running Argon2 off the event loop.
+
+    At most ``workers + queue_size`` jobs are handed to the pool at once,
+    further callers are rejected right away with 503. Workers are started
+    by a fork server, so they never inherit the event loop, the database
+    connections or the threads of the app. A pool broken by a dead worker
+    is replaced and its jobs fail with 503 too.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            context = multiprocessing.get_context('forkserver')
+            # Imported once by the server instead of by every worker.
+            context.set_forkserver_preload([__name__])
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context
+            )
+
+        return self._executor
+
+    @staticmethod
+    def _unavailable(detail: str):
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={'Retry-After': '1'},
+        )
+
+    async def run(self, func, *args):
+        if self.in_flight >= self.workers + self.queue_size:
+            self._unavailable('Password hashing is saturated')
+
+        executor = self.start()
+        loop = asyncio.get_running_loop()
+
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # Only the first job failing with it replaces the pool.
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._unavailable('Password hashing was interrupted')
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+        self._executor = None
+
+
+hashing_pool = HashingPool(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE
+)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_pool.run(get_password_hash, password)
+
+
+async def verify_and_update_async(
+    password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await hashing_pool.run(
+        verify_and_update_password, password, hashed_password
+    )
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
 
@@ -44,32 +171,127 @@ def create_access_token(data: dict) -> str:
 
 
 def decode_access_token(token: str) -> dict[str, Any]:
-    return decode(
+    key = hashlib.sha256(token.encode()).digest()
+
+    claims = verified_token_cache.get(key)
+    if claims is not None:
+        return dict(claims)
+
+    claims = decode(
         token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
     )
 
+    if 'exp' in claims:
+        verified_token_cache.set(key, dict(claims), expires_at=claims['exp'])
 
-async def get_current_user(
-    session: Session = Depends(get_session),
-    token: str = Depends(oauth2_scheme),
-):
-    credentials_exception = HTTPException(
+    return claims
+
+
+def token_claims(principal: 'User | Principal') -> dict[str, Any]:
+    return {
+        'sub': principal.email,
+        'uid': principal.id,
+        'ver': principal.token_version,
+    }
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
+
+
+def _decode_or_raise(token: str) -> dict[str, Any]:
     try:
         payload = decode_access_token(token)
     except PyJWTError:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    username: str = payload.get('sub')
-    if not username:
-        raise credentials_exception
+    if not payload.get('sub'):
+        raise _credentials_exception()
 
-    user = await session.scalar(select(User).where(User.email == username))
+    return payload
 
-    if not user:
-        raise credentials_exception
+
+async def get_current_user(
+    session: Session = Depends(get_session),
+    token: str = Depends(oauth2_scheme),
+):
+    payload = _decode_or_raise(token)
+    username: str = payload['sub']
+
+    cached_user = principal_cache.get(username)
+    if cached_user is not None:
+        user = await session.merge(cached_user, load=False)
+    else:
+        user = await session.scalar(select(User).where(User.email == username))
+
+        if not user:
+            raise _credentials_exception()
+
+        principal_cache.set(username, _detached_copy(user))
+
+    if payload.get('ver', user.token_version) != user.token_version:
+        raise _credentials_exception()
 
     return user
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    token_version: int
+
+
+async def get_current_principal(
+    session: Session = Depends(get_session),
+    token: str = Depends(oauth2_scheme),
+) -> Principal:
+    """Authenticated caller for routes that only need *some* valid user.
+
+    With ``JWT_STATELESS_PRINCIPAL`` enabled the principal is rebuilt from
+    the token claims alone, so the session is never used and no SQL is
+    issued. Tokens older than the last version bump of their user are
+    rejected through ``token_revocations``. While those may be incomplete,
+    which is always the case without ``CACHE_INVALIDATION_LISTEN``, the
+    principal is loaded from the database instead.
+    """
+    if not (settings.JWT_STATELESS_PRINCIPAL and revocations_synced.is_set()):
+        user = await get_current_user(session, token)
+        return Principal(user.id, user.email, user.token_version)
+
+    payload = _decode_or_raise(token)
+    user_id, version = payload.get('uid'), payload.get('ver')
+
+    if user_id is None or version is None:
+        raise _credentials_exception()
+
+    if version < token_revocations.get(user_id, 0):
+        raise _credentials_exception()
+
+    return Principal(user_id, payload['sub'], version)
+
+
+def revoke_tokens(user_id: int, version: int):
+    """Reject tokens of ``user_id`` issued before ``version``."""
+    token_revocations.set(user_id, version)
+
+
+def _detached_copy(user: User) -> User:
+    """Snapshot of ``user`` that no session will ever expire or mutate."""
+    mapper = inspect(User)
+    copy = mapper.class_manager.new_instance()
+
+    for attr in mapper.column_attrs:
+        setattr(copy, attr.key, getattr(user, attr.key))
+
+    make_transient_to_detached(copy)
+
+    return copy
+
+
+def invalidate_principal(email: str):
+    principal_cache.pop(email)
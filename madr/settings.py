@@ -7,6 +7,59 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_POOL_MIN_SIZE: int = 0
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5
+    DATABASE_READ_YOUR_WRITES_TRACKED: int = 10_000
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+
+    # Only effective along with CACHE_INVALIDATION_LISTEN, which alone
+    # tells every worker about revoked tokens.
+    JWT_STATELESS_PRINCIPAL: bool = False
+    TOKEN_REVOCATION_CACHE_SIZE: int = 100_000
+    TOKEN_DECODE_CACHE_SIZE: int = 4096
+
+    LOGIN_MAX_IN_FLIGHT: int = 8
+    LOGIN_IDENTITY_RATE_PER_MINUTE: float = 10
+    LOGIN_IDENTITY_BURST: int = 5
+    LOGIN_IP_RATE_PER_MINUTE: float = 60
+    LOGIN_IP_BURST: int = 20
+    LOGIN_TRACKED_KEYS: int = 10_000
+
+    PAGINATION_MAX_OFFSET: int = 10_000
+    PAGINATION_MAX_LIMIT: int = 1000
+
+    BULK_MAX_ITEMS: int = 5000
+    BULK_INSERT_CHUNK_SIZE: int = 1000
+
+    EXPORT_FETCH_SIZE: int = 1000
+
+    BOOK_RESPONSE_CACHE_SIZE: int = 4096
+    BOOK_RESPONSE_CACHE_TTL_SECONDS: float = 60
+    AUTHOR_RESPONSE_CACHE_SIZE: int = 1024
+    AUTHOR_RESPONSE_CACHE_TTL_SECONDS: float = 60
+
+    CACHE_INVALIDATION_LISTEN: bool = False
+    CACHE_INVALIDATION_HEARTBEAT_SECONDS: float = 10
+    CACHE_INVALIDATION_RETRY_MAX_SECONDS: float = 30
+
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_LEVEL: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
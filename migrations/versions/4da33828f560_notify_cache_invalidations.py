@@ -0,0 +1,72 @@
+"""Notify cache invalidations
+
+Revision ID: 4da33828f560
+Revises: 604ceb0987cf
+Create Date: 2026-10-18 05:13:16.548111
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4da33828f560'
+down_revision: Union[str, None] = '604ceb0987cf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger
+    AS $$
+    BEGIN
+        PERFORM pg_notify('cache_invalidation', json_build_object(
+            'table', TG_TABLE_NAME, 'id', OLD.id
+        )::text);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_user_invalidation() RETURNS trigger
+    AS $$
+    BEGIN
+        PERFORM pg_notify('cache_invalidation', json_build_object(
+            'table', TG_TABLE_NAME,
+            'id', OLD.id,
+            'email', OLD.email,
+            'token_version', CASE TG_OP
+                WHEN 'DELETE' THEN OLD.token_version + 1
+                ELSE NEW.token_version
+            END
+        )::text);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+    CREATE TRIGGER users_cache_invalidation
+    AFTER UPDATE OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION notify_user_invalidation()
+    """)
+    op.execute("""
+    CREATE TRIGGER authors_cache_invalidation
+    AFTER UPDATE OR DELETE ON authors
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation()
+    """)
+    op.execute("""
+    CREATE TRIGGER books_cache_invalidation
+    AFTER UPDATE OR DELETE ON books
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation()
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER books_cache_invalidation ON books')
+    op.execute('DROP TRIGGER authors_cache_invalidation ON authors')
+    op.execute('DROP TRIGGER users_cache_invalidation ON users')
+    op.execute('DROP FUNCTION notify_user_invalidation()')
+    op.execute('DROP FUNCTION notify_cache_invalidation()')
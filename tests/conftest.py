@@ -1,6 +1,7 @@
 import factory
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -10,7 +11,8 @@ from testcontainers.postgres import PostgresContainer
 
 from madr import security
 from madr.app import app
-from madr.database import get_session
+from madr.cache import clear_caches
+from madr.database import get_read_engine, get_read_session, get_session
 from madr.models import Author, Book, User, table_registry
 
 
@@ -41,6 +43,13 @@ class BookFactory(factory.Factory):
     author_id = factory.Sequence(lambda n: n)
 
 
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    clear_caches()
+    yield
+    clear_caches()
+
+
 @pytest.fixture(scope='session')
 async def engine():
     with PostgresContainer('postgres:16-alpine', driver='psycopg') as postgres:
@@ -60,6 +69,19 @@ async def session(engine: AsyncEngine):
         await conn.run_sync(table_registry.metadata.drop_all)
 
 
+@pytest.fixture
+def queries(engine: AsyncEngine):
+    """Statements sent to the database while the test runs."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, *_):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    yield statements
+    event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+
+
 @pytest.fixture
 def client(session):
     def get_session_override():
@@ -67,6 +89,8 @@ def client(session):
 
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_read_session] = get_session_override
+        app.dependency_overrides[get_read_engine] = lambda: session.bind
         yield client
 
     app.dependency_overrides.clear()
@@ -148,6 +172,16 @@ def token(client, user):
     return response.json()['access_token']
 
 
+@pytest.fixture
+def cached_token(client, token):
+    """Token whose principal is already cached, so writes skip its lookup."""
+    client.post(
+        '/auth/refresh_token', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    return token
+
+
 @pytest.fixture
 def invalid_token():
     data = {'sub': 'invalid_username@email.com'}
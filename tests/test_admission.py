@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+
+from madr.admission import LoginAdmission, RateLimit, TokenBucket
+
+
+def test_token_bucket_should_refill_over_time():
+    bucket = TokenBucket(rate=1, capacity=1, now=0)
+
+    assert bucket.consume(now=0) == 0
+    assert bucket.consume(now=0.5) == pytest.approx(0.5)
+    assert bucket.consume(now=1.5) == 0
+
+
+async def test_admission_should_reject_when_saturated():
+    admission = LoginAdmission(
+        max_in_flight=1,
+        identity_limit=RateLimit(rate=10, burst=10),
+        ip_limit=RateLimit(rate=10, burst=10),
+        max_tracked=10,
+        name='test_login',
+    )
+
+    async with admission.admit('user@email.com', '127.0.0.1'):
+        with pytest.raises(HTTPException) as exc:
+            async with admission.admit('other@email.com', '127.0.0.2'):
+                pass
+
+    assert exc.value.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert exc.value.headers == {'Retry-After': '1'}
+    assert admission.stats() == {
+        'in_flight': 0,
+        'max_in_flight': 1,
+        'admitted': 1,
+        'rejected': {'saturated': 1},
+    }
+
+
+async def test_admission_should_limit_each_identity():
+    admission = LoginAdmission(
+        max_in_flight=10,
+        identity_limit=RateLimit(rate=1 / 60, burst=1),
+        ip_limit=RateLimit(rate=10, burst=10),
+        max_tracked=10,
+        name='test_login',
+    )
+
+    async with admission.admit('user@email.com', '127.0.0.1'):
+        pass
+
+    with pytest.raises(HTTPException) as exc:
+        async with admission.admit('USER@email.com', '127.0.0.2'):
+            pass
+
+    assert exc.value.headers == {'Retry-After': '60'}
+    assert admission.stats()['rejected'] == {'identity': 1}
+
+    async with admission.admit('other@email.com', '127.0.0.1'):
+        pass
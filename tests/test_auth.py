@@ -1,6 +1,13 @@
+import asyncio
 from http import HTTPStatus
 
+import pytest
 from freezegun import freeze_time
+from httpx import ASGITransport, AsyncClient
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from madr import security
+from madr.app import app
 
 
 def test_login_token_should_return_token(client, user):
@@ -15,6 +22,38 @@ def test_login_token_should_return_token(client, user):
     assert response_data['token_type'] == 'Bearer'
 
 
+async def test_login_token_should_accept_requests_without_client(client, user):
+    # Unix sockets and some proxies leave the ASGI client unset.
+    transport = ASGITransport(app=app, client=None)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post(
+            '/auth/token',
+            data={'username': user.email, 'password': user.clean_password},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_login_token_should_release_connection_while_hashing(
+    client, session, user, monkeypatch
+):
+    in_transaction = []
+
+    async def verify_and_update(password, hashed_password):
+        in_transaction.append(session.in_transaction())
+        return security.verify_and_update_password(password, hashed_password)
+
+    monkeypatch.setattr(security, 'verify_and_update_async', verify_and_update)
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert in_transaction == [False]
+
+
 def test_login_token_should_return_bad_request(client, user):
     response = client.post(
         '/auth/token',
@@ -86,3 +125,143 @@ def test_should_not_decode_expired_token(client, user):
 
         assert response.status_code == HTTPStatus.UNAUTHORIZED
         assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_get_current_user_should_use_principal_cache(client, token):
+    for _ in range(2):
+        response = client.post(
+            '/auth/refresh_token',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    principals = response.json()['caches']['principals']
+    assert principals['hits'] == 1
+    assert principals['misses'] == 1
+
+
+@pytest.fixture
+def _stateless(monkeypatch):
+    """Stateless principals, with a listener caught up with revocations."""
+    synced = asyncio.Event()
+    synced.set()
+    monkeypatch.setattr(security.settings, 'JWT_STATELESS_PRINCIPAL', True)
+    monkeypatch.setattr(security, 'revocations_synced', synced)
+
+
+@pytest.mark.usefixtures('_stateless')
+def test_refresh_token_should_not_touch_database_when_stateless(client):
+    user_id = 42
+    token = security.create_access_token({
+        'sub': 'ghost@email.com',
+        'uid': user_id,
+        'ver': 0,
+    })
+
+    response = client.post(
+        '/auth/refresh_token', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    new_token = response.json()['access_token']
+    assert security.decode_access_token(new_token)['uid'] == user_id
+
+
+@pytest.mark.usefixtures('_stateless')
+def test_stateless_principal_should_reject_revoked_token(client, user, token):
+    security.revoke_tokens(user.id, user.token_version + 1)
+
+    response = client.post(
+        '/auth/refresh_token', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_stateless_principal_should_use_database_while_unsynced(
+    client, monkeypatch
+):
+    monkeypatch.setattr(security.settings, 'JWT_STATELESS_PRINCIPAL', True)
+    monkeypatch.setattr(security, 'revocations_synced', asyncio.Event())
+    token = security.create_access_token({
+        'sub': 'ghost@email.com',
+        'uid': 42,
+        'ver': 0,
+    })
+
+    response = client.post(
+        '/auth/refresh_token', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_stateless_principal_should_use_database_without_listener(
+    client, monkeypatch
+):
+    monkeypatch.setattr(security.settings, 'JWT_STATELESS_PRINCIPAL', True)
+    token = security.create_access_token({
+        'sub': 'ghost@email.com',
+        'uid': 42,
+        'ver': 0,
+    })
+
+    response = client.post(
+        '/auth/refresh_token', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert not security.revocations_synced.is_set()
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.usefixtures('_stateless')
+def test_stateless_principal_should_require_user_claims(client, invalid_token):
+    response = client.post(
+        '/auth/refresh_token',
+        headers={'Authorization': f'Bearer {invalid_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_login_token_should_return_too_many_requests(client, user):
+    for _ in range(security.settings.LOGIN_IDENTITY_BURST):
+        client.post(
+            '/auth/token',
+            data={'username': user.email, 'password': 'wrong_password'},
+        )
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.json() == {'detail': 'Too many login attempts'}
+    assert int(response.headers['Retry-After']) > 0
+
+
+async def test_login_token_should_rehash_outdated_password(
+    client, session, user
+):
+    user.password = Argon2Hasher(time_cost=1, memory_cost=8192).hash(
+        user.clean_password
+    )
+    await session.commit()
+    outdated_hash = user.password
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    await session.refresh(user)
+    assert user.password != outdated_hash
+    assert not security.pwd_context.current_hasher.check_needs_rehash(
+        user.password
+    )
+    assert security.verify_password(user.clean_password, user.password)
@@ -1,6 +1,12 @@
+import json
 from http import HTTPStatus
 
-from tests.conftest import AuthorFactory
+from madr.routes.authors import author_responses
+from madr.schemas import AuthorPublic
+from madr.settings import Settings
+from tests.conftest import AuthorFactory, BookFactory
+
+settings = Settings()
 
 
 def test_create_author_should_return_create_author(client, token):
@@ -163,4 +169,349 @@ def test_get_authors_should_return_empty_authors(client):
     response = client.get('/authors')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'authors': []}
+    assert response.json() == {'authors': [], 'next_cursor': None}
+
+
+async def test_get_authors_should_return_next_cursor(client, session):
+    authors_count = 3
+    session.add_all(AuthorFactory.create_batch(authors_count))
+    await session.commit()
+
+    first_page = client.get('/authors?order_by=name&limit=2').json()
+    second_page = client.get(
+        f'/authors?order_by=name&limit=2&cursor={first_page["next_cursor"]}'
+    ).json()
+
+    names = [a['name'] for a in first_page['authors'] + second_page['authors']]
+    assert names == sorted(names)
+    assert len(names) == authors_count
+    assert second_page['next_cursor'] is None
+
+
+def test_create_authors_should_report_each_item(client, author, token):
+    response = client.post(
+        '/authors/bulk',
+        json={
+            'authors': [
+                {'name': 'Machado de Assis'},
+                {'name': author.name},
+                {'name': 'machado   de assis'},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    results = response.json()['results']
+    assert results[0]['status'] == 'created'
+    assert results[0]['id']
+    assert results[1:] == [
+        {'index': 1, 'status': 'conflict', 'id': None},
+        {'index': 2, 'status': 'conflict', 'id': None},
+    ]
+
+
+def test_create_authors_should_limit_batch_size(client, token):
+    authors = [
+        {'name': f'author {index}'}
+        for index in range(settings.BULK_MAX_ITEMS + 1)
+    ]
+
+    response = client.post(
+        '/authors/bulk',
+        json={'authors': authors},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json()['detail'][0]['type'] == 'too_long'
+
+
+def test_export_authors_should_stream_ndjson(client, author, other_author):
+    response = client.get('/authors/export')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {'id': author.id, 'name': author.name},
+        {'id': other_author.id, 'name': other_author.name},
+    ]
+
+
+def test_author_writes_should_take_one_statement(
+    client, author, cached_token, queries
+):
+    headers = {'Authorization': f'Bearer {cached_token}'}
+    requests = [
+        ('post', '/authors', {'name': 'clarice lispector'}),
+        ('patch', f'/authors/{author.id}', {'name': 'cora coralina'}),
+        ('delete', f'/authors/{author.id}', None),
+    ]
+
+    for method, url, payload in requests:
+        queries.clear()
+        response = client.request(method, url, json=payload, headers=headers)
+
+        assert response.status_code < HTTPStatus.BAD_REQUEST
+        assert len(queries) == 1, (url, queries)
+
+
+def test_upsert_author_should_create_author(client, token):
+    response = client.put(
+        '/authors/by-name/Machado de Assis!',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['name'] == 'machado de assis'
+
+
+def test_upsert_author_should_return_existing_author(client, author, token):
+    response = client.put(
+        f'/authors/by-name/{author.name.upper()}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'id': author.id, 'name': author.name}
+
+
+def test_upsert_authors_should_report_each_item(client, author, token):
+    response = client.put(
+        '/authors/bulk',
+        json={
+            'authors': [
+                {'name': 'Machado de Assis'},
+                {'name': author.name},
+                {'name': 'machado   de assis'},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    results = response.json()['results']
+    assert results[0]['status'] == 'created'
+    assert results[1:] == [
+        {'index': 1, 'status': 'updated', 'id': author.id},
+        {'index': 2, 'status': 'created', 'id': results[0]['id']},
+    ]
+
+
+async def test_book_count_should_follow_book_writes(
+    client, session, author, other_author, token
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    books = [
+        {'year': 1899, 'title': 'dom casmurro', 'author_id': author.id},
+        {'year': 1881, 'title': 'bras cubas', 'author_id': author.id},
+    ]
+    response = client.post(
+        '/books/bulk', json={'books': books}, headers=headers
+    )
+    book_id = response.json()['results'][0]['id']
+
+    client.patch(
+        f'/books/{book_id}',
+        json={'author_id': other_author.id},
+        headers=headers,
+    )
+    await session.refresh(author)
+    await session.refresh(other_author)
+    assert (author.book_count, other_author.book_count) == (1, 1)
+
+    client.delete(f'/books/{book_id}', headers=headers)
+    await session.refresh(other_author)
+    assert other_author.book_count == 0
+
+
+async def test_get_author_should_include_stats(client, session, author):
+    session.add_all([
+        BookFactory(title='first', year=1881, author_id=author.id),
+        BookFactory(title='second', year=1899, author_id=author.id),
+        BookFactory(title='third', year=1890, author_id=author.id),
+    ])
+    await session.commit()
+
+    response = client.get(f'/authors/{author.id}?include=stats')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'id': author.id,
+        'name': author.name,
+        'stats': {
+            'book_count': 3,
+            'first_year': 1881,
+            'last_year': 1899,
+            'latest_titles': ['second', 'third', 'first'],
+        },
+    }
+
+
+def test_get_author_stats_should_handle_authors_without_books(client, author):
+    response = client.get(f'/authors/{author.id}?include=stats')
+
+    assert response.json()['stats'] == {
+        'book_count': 0,
+        'first_year': None,
+        'last_year': None,
+        'latest_titles': [],
+    }
+
+
+def test_get_author_stats_should_return_not_found(client):
+    response = client.get('/authors/1?include=stats')
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Author does not exist'}
+
+
+async def test_get_authors_should_sort_by_book_count(
+    client, session, author, other_author
+):
+    third_author = AuthorFactory()
+    session.add(third_author)
+    await session.commit()
+    session.add_all([
+        BookFactory(author_id=other_author.id),
+        BookFactory(author_id=other_author.id),
+        BookFactory(author_id=author.id),
+    ])
+    await session.commit()
+    # Load the counts written by the triggers instead of the stale authors.
+    session.expunge_all()
+
+    first_page = client.get('/authors?order_by=book_count&limit=2').json()
+    second_page = client.get(
+        '/authors?order_by=book_count&limit=2'
+        f'&cursor={first_page["next_cursor"]}'
+    ).json()
+
+    assert [item['id'] for item in first_page['authors']] == [
+        other_author.id,
+        author.id,
+    ]
+    assert second_page == {
+        'authors': [{'id': third_author.id, 'name': third_author.name}],
+        'next_cursor': None,
+    }
+
+
+def test_get_author_should_serve_repeated_reads_from_cache(
+    client, author, queries
+):
+    first = client.get(f'/authors/{author.id}')
+    queries.clear()
+    second = client.get(f'/authors/{author.id}')
+
+    assert second.json() == first.json()
+    assert queries == []
+    assert author_responses.stats()['hits'] == 1
+
+
+def test_update_author_should_invalidate_cached_response(
+    client, author, token
+):
+    client.get(f'/authors/{author.id}')
+
+    client.patch(
+        f'/authors/{author.id}',
+        json={'name': 'cora coralina'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    response = client.get(f'/authors/{author.id}')
+
+    assert response.json()['name'] == 'cora coralina'
+
+
+def test_upsert_authors_should_invalidate_cached_responses(
+    client, author, token
+):
+    client.get(f'/authors/{author.id}')
+
+    client.put(
+        '/authors/bulk',
+        json={'authors': [{'name': author.name}]},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert author_responses.stats()['size'] == 0
+
+
+def test_get_author_should_answer_not_modified(client, author):
+    response = client.get(f'/authors/{author.id}')
+
+    response = client.get(
+        f'/authors/{author.id}',
+        headers={'If-Modified-Since': response.headers['last-modified']},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_get_authors_should_answer_not_modified(
+    client, session, author, token
+):
+    etag = client.get('/authors').headers['etag']
+
+    client.patch(
+        f'/authors/{author.id}',
+        json={'name': 'cora coralina'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    # Requests share this session in tests, drop its stale updated_at.
+    session.expunge_all()
+    response = client.get('/authors', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['authors'][0]['name'] == 'cora coralina'
+    assert (
+        client.get(
+            '/authors', headers={'If-None-Match': response.headers['etag']}
+        ).status_code
+        == HTTPStatus.NOT_MODIFIED
+    )
+
+
+def test_get_authors_should_not_be_dated(client, author):
+    response = client.get('/authors')
+
+    assert 'last-modified' not in response.headers
+    assert (
+        client.get(
+            '/authors',
+            headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'},
+        ).status_code
+        == HTTPStatus.OK
+    )
+
+
+def test_get_authors_should_serialize_rows_like_author_public(client, author):
+    response = client.get('/authors')
+
+    assert list(response.json()['authors'][0].items()) == list(
+        AuthorPublic.model_validate(author).model_dump().items()
+    )
+
+
+async def test_get_authors_should_page_through_requested_fields(
+    client, session
+):
+    session.add_all(AuthorFactory(name=name) for name in 'cab')
+    await session.commit()
+
+    first_page = client.get('/authors?fields=id&order_by=name&limit=2').json()
+    second_page = client.get(
+        f'/authors?fields=id&order_by=name&limit=2'
+        f'&cursor={first_page["next_cursor"]}'
+    ).json()
+
+    assert first_page['authors'] == [{'id': 2}, {'id': 3}]
+    assert second_page['authors'] == [{'id': 1}]
+
+
+def test_get_authors_should_reject_unknown_fields(client):
+    response = client.get('/authors?fields=book_count')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid fields'}
@@ -1,5 +1,13 @@
+import json
 from http import HTTPStatus
 
+from fastapi import Request
+from sqlalchemy import update
+
+from madr import bulk, database
+from madr.models import Book
+from madr.routes.books import book_responses
+from madr.schemas import BookPublic
 from tests.conftest import BookFactory
 
 
@@ -211,4 +219,498 @@ def test_get_books_should_return_empty_books(client):
     response = client.get('/books')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'books': []}
+    assert response.json() == {'books': [], 'next_cursor': None}
+
+
+async def test_get_books_should_normalize_title_filter(
+    client, author, session
+):
+    books = BookFactory.create_batch(5, author_id=author.id)
+    book = books[0]
+    book.title = 'androides sonham com ovelhas elétricas'
+    session.add_all(books)
+    await session.commit()
+
+    response = client.get('/books?title=  Sonham   COM ovelhas?')
+
+    assert response.status_code == HTTPStatus.OK
+    assert [b['title'] for b in response.json()['books']] == [book.title]
+
+
+async def test_get_books_should_escape_like_wildcards(client, author, session):
+    session.add_all(BookFactory.create_batch(5, author_id=author.id))
+    await session.commit()
+
+    response = client.get('/books?title=tit_e')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['books'] == []
+
+
+async def test_get_books_should_walk_pages_with_cursor(
+    client, author, session
+):
+    books_count = 5
+    limit = 2
+    session.add_all(BookFactory.create_batch(books_count, author_id=author.id))
+    await session.commit()
+
+    titles = []
+    cursor = None
+    for _ in range(3):
+        params = {'order_by': 'title', 'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        response = client.get('/books', params=params)
+        assert response.status_code == HTTPStatus.OK
+        titles.extend(book['title'] for book in response.json()['books'])
+        cursor = response.json()['next_cursor']
+
+    assert cursor is None
+    assert titles == sorted(titles)
+    assert len(set(titles)) == books_count
+
+
+def test_get_books_should_reject_invalid_cursor(client):
+    response = client.get('/books?cursor=invalid')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+async def test_get_books_should_reject_cursor_of_other_ordering(
+    client, author, session
+):
+    session.add_all(BookFactory.create_batch(2, author_id=author.id))
+    await session.commit()
+    cursor = client.get('/books?limit=1').json()['next_cursor']
+
+    response = client.get(f'/books?order_by=year&cursor={cursor}')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_get_books_should_cap_offset(client):
+    response = client.get('/books?offset=1000000')
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_create_books_should_report_each_item(
+    client, author, book, token, monkeypatch
+):
+    monkeypatch.setattr(bulk.settings, 'BULK_INSERT_CHUNK_SIZE', 1)
+
+    response = client.post(
+        '/books/bulk',
+        json={
+            'books': [
+                {'year': 1899, 'title': 'Casmurro', 'author_id': author.id},
+                {'year': 1900, 'title': book.title, 'author_id': author.id},
+                {'year': 1901, 'title': 'Orphan', 'author_id': author.id + 1},
+                {'year': 1881, 'title': 'Memórias', 'author_id': author.id},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    statuses = [item['status'] for item in response.json()['results']]
+    assert statuses == ['created', 'conflict', 'invalid_author', 'created']
+
+    response = client.get('/books?title=casmurro')
+    assert len(response.json()['books']) == 1
+
+
+def test_create_books_should_skip_authors_deleted_after_the_check(
+    client, author, token, monkeypatch
+):
+    checks = []
+
+    async def deleted_after_check(session, rows):
+        checks.append(rows)
+        return set() if len(checks) == 1 else {1}
+
+    monkeypatch.setattr(
+        'madr.routes.books._unknown_authors', deleted_after_check
+    )
+
+    response = client.post(
+        '/books/bulk',
+        json={
+            'books': [
+                {'year': 1899, 'title': 'Casmurro', 'author_id': author.id},
+                {'year': 1901, 'title': 'Orphan', 'author_id': author.id + 1},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    statuses = [item['status'] for item in response.json()['results']]
+    assert statuses == ['created', 'invalid_author']
+    assert len(checks) == 2  # noqa: PLR2004
+
+
+def test_export_books_should_stream_ndjson(client, book, other_book):
+    response = client.get('/books/export')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {
+            'id': exported.id,
+            'title': exported.title,
+            'year': exported.year,
+            'author_id': exported.author_id,
+        }
+        for exported in (book, other_book)
+    ]
+
+
+def test_book_writes_should_take_one_statement(
+    client, author, book, cached_token, queries
+):
+    headers = {'Authorization': f'Bearer {cached_token}'}
+    new_book = {'year': 1977, 'title': 'a hora da estrela'}
+    requests = [
+        ('post', '/books', {**new_book, 'author_id': author.id}),
+        ('patch', f'/books/{book.id}', {'year': 1978}),
+        ('delete', f'/books/{book.id}', None),
+    ]
+
+    for method, url, payload in requests:
+        queries.clear()
+        response = client.request(method, url, json=payload, headers=headers)
+
+        assert response.status_code < HTTPStatus.BAD_REQUEST
+        assert len(queries) == 1, (url, queries)
+
+
+def test_upsert_book_should_create_book(client, author, token):
+    response = client.put(
+        '/books/by-title/Dom Casmurro',
+        json={'year': 1899, 'author_id': author.id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json() == {
+        'id': response.json()['id'],
+        'title': 'dom casmurro',
+        'year': 1899,
+        'author_id': author.id,
+    }
+
+
+def test_upsert_book_should_update_book(client, book, other_author, token):
+    response = client.put(
+        f'/books/by-title/{book.title}',
+        json={'year': 1899, 'author_id': other_author.id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'id': book.id,
+        'title': book.title,
+        'year': 1899,
+        'author_id': other_author.id,
+    }
+
+
+async def test_upsert_book_should_keep_updated_at_when_unchanged(
+    client, session, book, token
+):
+    updated_at = book.updated_at
+
+    response = client.put(
+        f'/books/by-title/{book.title}',
+        json={'year': book.year, 'author_id': book.author_id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    await session.refresh(book)
+    assert book.updated_at == updated_at
+
+
+def test_upsert_book_should_return_not_found_for_unknown_author(client, token):
+    response = client.put(
+        '/books/by-title/dom casmurro',
+        json={'year': 1899, 'author_id': 999},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Author does not exist'}
+
+
+def test_upsert_books_should_report_each_item(client, author, book, token):
+    response = client.put(
+        '/books/bulk',
+        json={
+            'books': [
+                {'year': 1899, 'title': 'new title', 'author_id': author.id},
+                {'year': 1900, 'title': book.title, 'author_id': author.id},
+                {'year': 1901, 'title': 'other', 'author_id': 999},
+                {'year': 1902, 'title': 'new title', 'author_id': author.id},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    results = response.json()['results']
+    assert results[0]['status'] == 'created'
+    assert results[1:] == [
+        {'index': 1, 'status': 'updated', 'id': book.id},
+        {'index': 2, 'status': 'invalid_author', 'id': None},
+        {'index': 3, 'status': 'created', 'id': results[0]['id']},
+    ]
+
+    response = client.get(f'/books/{results[0]["id"]}')
+    assert response.json()['year'] == 1902  # noqa: PLR2004
+
+
+def test_upsert_books_should_skip_authors_deleted_after_the_check(
+    client, author, token, monkeypatch
+):
+    checks = []
+
+    async def deleted_after_check(session, rows):
+        checks.append(rows)
+        return set() if len(checks) == 1 else {1}
+
+    monkeypatch.setattr(
+        'madr.routes.books._unknown_authors', deleted_after_check
+    )
+
+    response = client.put(
+        '/books/bulk',
+        json={
+            'books': [
+                {'year': 1899, 'title': 'new title', 'author_id': author.id},
+                {'year': 1901, 'title': 'other', 'author_id': author.id + 1},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    statuses = [item['status'] for item in response.json()['results']]
+    assert statuses == ['created', 'invalid_author']
+    assert len(checks) == 2  # noqa: PLR2004
+
+
+def test_get_book_should_embed_author_when_expanded(
+    client, book, author, queries
+):
+    response = client.get(f'/books/{book.id}?expand=author')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['author'] == {'id': author.id, 'name': author.name}
+    assert len(queries) == 1
+
+
+async def test_get_books_should_embed_authors_when_expanded(
+    client, session, author, other_author, queries
+):
+    books = [
+        BookFactory(author_id=author.id),
+        BookFactory(author_id=other_author.id),
+        BookFactory(author_id=author.id),
+    ]
+    session.add_all(books)
+    await session.commit()
+    session.expunge_all()
+    queries.clear()
+
+    response = client.get('/books?expand=author')
+
+    assert response.status_code == HTTPStatus.OK
+    assert [book['author']['name'] for book in response.json()['books']] == [
+        author.name,
+        other_author.name,
+        author.name,
+    ]
+    assert len(queries) == 2  # noqa: PLR2004
+
+
+def test_get_books_should_not_embed_authors_by_default(client, book):
+    response = client.get('/books')
+
+    assert 'author' not in response.json()['books'][0]
+
+
+def test_get_book_should_serve_repeated_reads_from_cache(
+    client, book, queries
+):
+    first = client.get(f'/books/{book.id}')
+    queries.clear()
+    second = client.get(f'/books/{book.id}')
+
+    assert second.json() == first.json()
+    assert queries == []
+    assert book_responses.stats()['hits'] == 1
+
+
+def test_update_book_should_invalidate_cached_response(client, book, token):
+    client.get(f'/books/{book.id}')
+
+    client.patch(
+        f'/books/{book.id}',
+        json={'year': 1999},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    response = client.get(f'/books/{book.id}')
+
+    assert response.json()['year'] == 1999  # noqa: PLR2004
+
+
+def test_delete_book_should_invalidate_cached_response(client, book, token):
+    client.get(f'/books/{book.id}')
+
+    client.delete(
+        f'/books/{book.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+    response = client.get(f'/books/{book.id}')
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_get_book_should_answer_not_modified(client, book, queries):
+    book_responses.clear()
+    response = client.get(f'/books/{book.id}')
+    etag = response.headers['etag']
+
+    assert response.headers['last-modified']
+    # From the response cache, then from the database.
+    for expected_queries in (0, 1):
+        queries.clear()
+        response = client.get(
+            f'/books/{book.id}', headers={'If-None-Match': etag}
+        )
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        # Weakened, the client accepts compressed bodies.
+        assert response.headers['etag'] == f'W/{etag}'
+        assert not response.content
+        assert len(queries) == expected_queries
+        book_responses.clear()
+
+
+def test_update_book_should_change_etag(client, session, book, token):
+    etag = client.get(f'/books/{book.id}').headers['etag']
+
+    client.patch(
+        f'/books/{book.id}',
+        json={'year': 1999},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    # Requests share this session in tests, drop its stale updated_at.
+    session.expunge_all()
+    response = client.get(f'/books/{book.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['etag'] != etag
+
+
+def test_get_books_should_answer_not_modified(client, book):
+    etag = client.get('/books?expand=author').headers['etag']
+
+    response = client.get(
+        '/books?expand=author', headers={'If-None-Match': etag}
+    )
+    other_query = client.get('/books', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert other_query.status_code == HTTPStatus.OK
+
+
+def test_get_books_should_serialize_rows_like_book_public(client, book):
+    response = client.get('/books')
+
+    assert response.headers['content-type'] == 'application/json'
+    assert list(response.json()['books'][0].items()) == list(
+        BookPublic.model_validate(book).model_dump().items()
+    )
+
+
+def test_get_books_should_select_only_requested_fields(client, book, queries):
+    response = client.get('/books?fields=title,id')
+
+    assert response.json()['books'] == [{'title': book.title, 'id': book.id}]
+    assert 'books.year' not in queries[0][0]
+
+
+def test_get_books_should_narrow_expanded_books(client, book, author):
+    response = client.get('/books?fields=title&expand=author')
+
+    assert response.json()['books'] == [
+        {'title': book.title, 'author': {'name': author.name, 'id': author.id}}
+    ]
+
+
+def test_get_books_should_reject_unknown_fields(client):
+    response = client.get('/books?fields=id,password')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid fields'}
+
+
+def test_get_book_should_not_cache_replica_reads(
+    client, session, book, monkeypatch
+):
+    monkeypatch.setattr(database.read_router, 'replicas', [session.bind])
+
+    client.get(f'/books/{book.id}')
+
+    assert len(book_responses) == 0
+
+
+def test_get_book_should_not_cache_rows_updated_while_reading(
+    client, session, book, monkeypatch
+):
+    scalar = session.scalar
+    year = 1999
+
+    async def scalar_then_update(query):
+        book_db = await scalar(query)
+        # An update commits and evicts while the read is awaited.
+        await session.execute(
+            update(Book)
+            .where(Book.id == book.id)
+            .values(year=year)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        book_responses.pop(book.id)
+        return book_db
+
+    monkeypatch.setattr(session, 'scalar', scalar_then_update)
+    client.get(f'/books/{book.id}')
+    monkeypatch.undo()
+    session.expunge_all()
+
+    assert len(book_responses) == 0
+    assert client.get(f'/books/{book.id}').json()['year'] == year
+
+
+def test_get_book_should_bypass_cache_for_pinned_clients(
+    client, book, token, queries, monkeypatch
+):
+    monkeypatch.setattr(database.read_router, 'replicas', [object()])
+    client.get(f'/books/{book.id}')
+    headers = {'Authorization': f'Bearer {token}'}
+    database.read_router.record_write(
+        Request({
+            'type': 'http',
+            'headers': [(b'authorization', headers['Authorization'].encode())],
+        })
+    )
+    queries.clear()
+
+    client.get(f'/books/{book.id}', headers=headers)
+
+    assert queries
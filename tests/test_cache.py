@@ -0,0 +1,94 @@
+from madr.cache import TTLCache, caches_stats
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_should_count_hits_and_misses():
+    cache = TTLCache('test-hits', maxsize=2)
+    cache.set('key', 'value')
+
+    assert cache.get('key') == 'value'
+    assert cache.get('other') is None
+    assert cache.stats() == {
+        'size': 1,
+        'maxsize': 2,
+        'hits': 1,
+        'misses': 1,
+        'hit_ratio': 0.5,
+    }
+
+
+def test_cache_should_evict_least_recently_used():
+    cache = TTLCache('test-lru', maxsize=2)
+    cache.set('a', 'first')
+    cache.set('b', 'second')
+    cache.get('a')
+    cache.set('c', 'third')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'first'
+    assert cache.get('c') == 'third'
+
+
+def test_cache_should_expire_entries_after_ttl():
+    timer = FakeTimer()
+    cache = TTLCache('test-ttl', maxsize=2, ttl=10, timer=timer)
+    cache.set('key', 'value')
+
+    timer.now = 9.9
+    assert cache.get('key') == 'value'
+
+    timer.now = 10
+    assert cache.get('key') is None
+    assert len(cache) == 0
+
+
+def test_cache_should_honor_explicit_expiration():
+    timer = FakeTimer()
+    cache = TTLCache('test-expires-at', maxsize=2, ttl=10, timer=timer)
+    cache.set('key', 'value', expires_at=1)
+
+    timer.now = 1
+    assert cache.get('key') is None
+
+
+def test_cache_with_zero_size_should_not_store():
+    cache = TTLCache('test-disabled', maxsize=0)
+    cache.set('key', 'value')
+
+    assert cache.get('key') is None
+
+
+def test_caches_stats_should_list_registered_caches():
+    TTLCache('test-registry', maxsize=1)
+
+    assert 'test-registry' in caches_stats()
+
+
+def test_cache_should_drop_values_read_before_an_invalidation():
+    cache = TTLCache('test-generations', maxsize=2)
+    generation = cache.generation('key')
+    cache.pop('key')
+
+    cache.set('key', 'stale', generation=generation)
+    assert cache.get('key') is None
+
+    cache.set('key', 'fresh', generation=cache.generation('key'))
+    assert cache.get('key') == 'fresh'
+
+
+def test_cache_should_drop_values_when_forgetting_generations():
+    cache = TTLCache('test-forgotten-generations', maxsize=1)
+    generation = cache.generation('key')
+    cache.pop('key')
+    cache.pop('other')
+
+    cache.set('key', 'stale', generation=generation)
+
+    assert cache.get('key') is None
@@ -0,0 +1,46 @@
+from madr.cli import calibrate_argon2, main
+
+
+def fake_measure(time_cost, memory_cost, parallelism):
+    return time_cost * memory_cost / 65536
+
+
+def test_calibrate_argon2_should_add_passes_until_target():
+    result = calibrate_argon2(
+        target=3, memory_cost=65536, parallelism=2, measure=fake_measure
+    )
+
+    assert result == {
+        'ARGON2_TIME_COST': 3,
+        'ARGON2_MEMORY_COST': 65536,
+        'ARGON2_PARALLELISM': 2,
+    }
+
+
+def test_calibrate_argon2_should_reduce_memory_to_fit_target():
+    result = calibrate_argon2(
+        target=0.25, memory_cost=65536, parallelism=1, measure=fake_measure
+    )
+
+    assert result == {
+        'ARGON2_TIME_COST': 1,
+        'ARGON2_MEMORY_COST': 16384,
+        'ARGON2_PARALLELISM': 1,
+    }
+
+
+def test_calibrate_command_should_print_settings(capsys):
+    main([
+        'calibrate',
+        '--target-ms',
+        '1',
+        '--memory-cost',
+        '8192',
+        '--parallelism',
+        '1',
+    ])
+
+    output = capsys.readouterr().out
+
+    assert 'ARGON2_MEMORY_COST=8192' in output
+    assert 'ARGON2_PARALLELISM=1' in output
@@ -0,0 +1,142 @@
+import gzip
+import zlib
+from http import HTTPStatus
+
+import pytest
+
+from madr.compression import CompressionMiddleware, negotiate
+from tests.conftest import BookFactory
+
+
+@pytest.mark.parametrize(
+    ('accept_encoding', 'expected'),
+    [
+        ('gzip, br, zstd', 'zstd'),
+        ('gzip;q=1, zstd;q=0.5', 'gzip'),
+        ('br;q=0, *', 'zstd'),
+        ('zstd;q=0, br;q=0, gzip;q=0', None),
+        ('identity', None),
+        ('', None),
+        ('GZIP;q=invalid, br', 'br'),
+    ],
+)
+def test_negotiate_should_pick_the_most_weighted_coding(
+    accept_encoding, expected
+):
+    assert negotiate(accept_encoding, ['zstd', 'br', 'gzip']) == expected
+
+
+def streaming_app(*chunks, headers=()):
+    async def app(scope, receive, send):
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'text/plain'), *headers],
+        })
+        for index, chunk in enumerate(chunks):
+            await send({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': index < len(chunks) - 1,
+            })
+
+    return app
+
+
+async def call(app, accept_encoding='gzip'):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = CompressionMiddleware(
+        app, minimum_size=10, levels={'gzip': 6}
+    )
+    await middleware(
+        {
+            'type': 'http',
+            'headers': [(b'accept-encoding', accept_encoding.encode())],
+        },
+        None,
+        send,
+    )
+
+    return messages[0], messages[1:]
+
+
+async def test_middleware_should_flush_each_streamed_chunk():
+    start, bodies = await call(streaming_app(b'first ', b'second', b''))
+    decompressor = zlib.decompressobj(31)
+
+    assert (b'content-encoding', b'gzip') in start['headers']
+    assert [decompressor.decompress(body['body']) for body in bodies] == [
+        b'first ',
+        b'second',
+        b'',
+    ]
+
+
+async def test_middleware_should_skip_small_bodies():
+    start, bodies = await call(streaming_app(b'short'))
+
+    assert (b'content-encoding', b'gzip') not in start['headers']
+    assert bodies[0]['body'] == b'short'
+
+
+async def test_middleware_should_validate_bodiless_responses_as_compressed():
+    start, bodies = await call(
+        streaming_app(b'', headers=[(b'etag', b'"tag"')])
+    )
+
+    assert (b'etag', b'W/"tag"') in start['headers']
+    assert (b'vary', b'Accept-Encoding') in start['headers']
+    assert (b'content-encoding', b'gzip') not in start['headers']
+    assert bodies[0]['body'] == b''
+
+
+async def test_middleware_should_skip_encoded_bodies():
+    body = gzip.compress(b'already compressed body')
+    _, bodies = await call(
+        streaming_app(body, headers=[(b'content-encoding', b'gzip')])
+    )
+
+    assert bodies[0]['body'] == body
+
+
+async def test_middleware_should_skip_clients_without_codings():
+    _, bodies = await call(
+        streaming_app(b'long enough body'), accept_encoding='identity'
+    )
+
+    assert bodies[0]['body'] == b'long enough body'
+
+
+async def test_get_books_should_be_compressed(client, session, author):
+    books_count = 50
+    session.add_all(BookFactory.create_batch(books_count, author_id=author.id))
+    await session.commit()
+
+    response = client.get(
+        f'/books?limit={books_count}', headers={'Accept-Encoding': 'gzip'}
+    )
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.headers['etag'].startswith('W/')
+    assert len(response.json()['books']) == books_count
+    assert (
+        client.get(
+            f'/books?limit={books_count}',
+            headers={
+                'Accept-Encoding': 'gzip',
+                'If-None-Match': response.headers['etag'],
+            },
+        ).status_code
+        == HTTPStatus.NOT_MODIFIED
+    )
+
+
+def test_small_responses_should_not_be_compressed(client):
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'content-encoding' not in response.headers
@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from starlette.requests import Request
+
+from madr.conditional import Validators
+
+
+@dataclass
+class Row:
+    id: int
+    updated_at: datetime
+
+
+def request_with(**headers):
+    return Request({
+        'type': 'http',
+        'headers': [
+            (name.replace('_', '-').encode(), value.encode())
+            for name, value in headers.items()
+        ],
+    })
+
+
+def test_validators_should_change_with_updated_at():
+    first = Validators.of('book', [Row(1, datetime(2024, 1, 1, 12))])
+    second = Validators.of('book', [Row(1, datetime(2024, 1, 1, 13))])
+
+    assert first.etag != second.etag
+    assert first.headers() == {
+        'ETag': first.etag,
+        'Last-Modified': 'Mon, 01 Jan 2024 12:00:00 GMT',
+    }
+
+
+def test_validators_should_tell_groups_apart():
+    book, author = Row(1, datetime(2024, 1, 1)), Row(2, datetime(2024, 1, 1))
+
+    assert (
+        Validators.of('books', [book, author]).etag
+        != Validators.of('books', [book], [author]).etag
+    )
+
+
+def test_validators_should_omit_last_modified_without_rows():
+    validators = Validators.of('books', [])
+
+    assert validators.headers() == {'ETag': validators.etag}
+
+
+def test_not_modified_should_match_any_listed_etag():
+    validators = Validators.of('book', [Row(1, datetime(2024, 1, 1))])
+
+    assert validators.not_modified(
+        request_with(if_none_match=f'"other", W/{validators.etag}')
+    )
+    assert validators.not_modified(request_with(if_none_match='*'))
+    assert not validators.not_modified(request_with(if_none_match='"other"'))
+
+
+def test_not_modified_should_prefer_etags_over_dates():
+    validators = Validators.of('book', [Row(1, datetime(2024, 1, 1))])
+
+    assert not validators.not_modified(
+        request_with(
+            if_none_match='"other"',
+            if_modified_since='Tue, 02 Jan 2024 00:00:00 GMT',
+        )
+    )
+
+
+def test_not_modified_should_compare_dates_to_the_second():
+    validators = Validators.of(
+        'book', [Row(1, datetime(2024, 1, 1, 12, 0, 0, 5))]
+    )
+
+    assert validators.not_modified(
+        request_with(if_modified_since='Mon, 01 Jan 2024 12:00:00 GMT')
+    )
+    assert not validators.not_modified(
+        request_with(if_modified_since='Mon, 01 Jan 2024 11:59:59 GMT')
+    )
+    assert not validators.not_modified(
+        request_with(if_modified_since='yesterday')
+    )
+
+
+def test_undated_validators_should_only_match_etags():
+    validators = Validators.of(
+        'books', [Row(1, datetime(2024, 1, 1))], dated=False
+    )
+
+    assert validators.headers() == {'ETag': validators.etag}
+    assert not validators.not_modified(
+        request_with(if_modified_since='Tue, 02 Jan 2024 00:00:00 GMT')
+    )
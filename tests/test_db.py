@@ -1,6 +1,14 @@
 import pytest
+from fastapi import Request
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
 
+from madr.database import (
+    InstrumentedQueuePool,
+    ReadRouter,
+    pool_stats,
+    warm_up,
+)
 from madr.models import User
 
 
@@ -13,3 +21,80 @@ async def test_create_user(session):
     user = await session.scalar(select(User).where(User.username == 'Alice'))
 
     assert user.username == new_user.username
+
+
+async def test_warm_up_should_fill_the_pool(engine):
+    pool_size = 2
+    pooled_engine = create_async_engine(
+        engine.url, poolclass=InstrumentedQueuePool, pool_size=pool_size
+    )
+
+    await warm_up(pooled_engine, pool_size + 1)
+    stats = pool_stats(pooled_engine)
+    await pooled_engine.dispose()
+
+    assert stats['checked_in'] == pool_size
+    assert stats['checked_out'] == 0
+    assert stats['checkouts'] == pool_size
+
+
+def make_request(
+    method='GET', authorization=None, client=('127.0.0.1', 50000)
+):
+    headers = []
+    if authorization:
+        headers.append((b'authorization', authorization.encode()))
+
+    return Request({
+        'type': 'http',
+        'method': method,
+        'headers': headers,
+        'client': client,
+    })
+
+
+def test_read_router_should_round_robin_replicas():
+    primary, first, second = object(), object(), object()
+    router = ReadRouter(
+        primary, [first, second], pin_seconds=5, max_tracked=10, name='rr'
+    )
+
+    engines = [router.engine_for(make_request()) for _ in range(3)]
+
+    assert engines == [first, second, first]
+
+
+def test_read_router_should_pin_recent_writers_to_primary():
+    primary, replica = object(), object()
+    router = ReadRouter(
+        primary, [replica], pin_seconds=5, max_tracked=10, name='pin'
+    )
+
+    router.record_write(make_request('POST', 'Bearer writer'))
+
+    assert router.engine_for(make_request(authorization='Bearer writer')) is (
+        primary
+    )
+    assert router.engine_for(make_request(authorization='Bearer other')) is (
+        replica
+    )
+
+
+def test_read_router_should_pin_writers_without_client_address():
+    primary, replica = object(), object()
+    router = ReadRouter(
+        primary, [replica], pin_seconds=5, max_tracked=10, name='no_client'
+    )
+
+    router.record_write(make_request('POST', client=None))
+
+    assert router.engine_for(make_request(client=None)) is primary
+
+
+def test_read_router_without_replicas_should_use_primary():
+    primary = object()
+    router = ReadRouter(
+        primary, [], pin_seconds=5, max_tracked=10, name='no_replicas'
+    )
+
+    assert router.engine_for(make_request()) is primary
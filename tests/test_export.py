@@ -0,0 +1,23 @@
+import json
+
+from sqlalchemy import select
+
+from madr import export
+from madr.models import Author
+from tests.conftest import AuthorFactory
+
+
+async def test_ndjson_lines_should_yield_one_chunk_per_fetch(
+    session, monkeypatch
+):
+    monkeypatch.setattr(export.settings, 'EXPORT_FETCH_SIZE', 2)
+    session.add_all(AuthorFactory(name=name) for name in 'abc')
+    await session.commit()
+
+    query = select(Author.name).order_by(Author.id)
+    chunks = [
+        chunk async for chunk in export.ndjson_lines(session.bind, query)
+    ]
+
+    assert [chunk.count(b'\n') for chunk in chunks] == [2, 1]
+    assert json.loads(chunks[-1]) == {'name': 'c'}
@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+from sqlalchemy import select
+
+from madr.importer import import_catalog, iter_file, read_records
+from madr.models import Author, Book
+
+
+async def chunks_of(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def test_read_records_should_join_lines_split_across_chunks():
+    data = 'name\r\nJosé Saramago\nclarice\n'.encode()
+
+    records = [
+        record async for record in read_records(chunks_of(data, 3), 'csv')
+    ]
+
+    assert records == [
+        (1, {'name': 'José Saramago'}),
+        (2, {'name': 'clarice'}),
+    ]
+
+
+async def test_read_records_should_keep_invalid_json_lines():
+    data = b'{"name": "a"}\nnot json\n\n{"name": "b"}'
+
+    records = [
+        record async for record in read_records(chunks_of(data, 5), 'ndjson')
+    ]
+
+    assert records == [(1, {'name': 'a'}), (2, 'not json'), (3, {'name': 'b'})]
+
+
+def test_import_authors_should_report_collisions(client, token, author):
+    data = f'name\nMachado de Assis!\n{author.name}\nmachado de assis\n'
+
+    response = client.post(
+        '/import/authors',
+        headers={'Authorization': f'Bearer {token}'},
+        content=data.encode(),
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert response.headers['x-imported-rows'] == '1'
+    assert response.headers['x-rejected-rows'] == '2'
+    assert list(csv.reader(io.StringIO(response.text))) == [
+        ['line', 'reason', 'value'],
+        ['2', 'name already exists', author.name],
+        ['3', 'name already exists', 'machado de assis'],
+    ]
+
+
+async def test_import_books_should_resolve_authors_by_name(
+    client, session, token, author, book
+):
+    rows = [
+        {'title': 'Dom Casmurro', 'year': 1899, 'author': author.name},
+        {'title': 'sem autor', 'year': 1900, 'author': 'nobody'},
+        {'title': book.title, 'year': 1901, 'author': author.name},
+        {'title': 'no year', 'author': 'nobody'},
+    ]
+    data = '\n'.join(json.dumps(row) for row in rows)
+
+    response = client.post(
+        '/import/books?format=ndjson',
+        headers={'Authorization': f'Bearer {token}'},
+        content=data.encode(),
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['x-imported-rows'] == '1'
+    assert response.headers['x-rejected-rows'] == '3'
+
+    rejects = list(csv.reader(io.StringIO(response.text)))[1:]
+    assert [row[:2] for row in rejects] == [
+        ['4', 'invalid row'],
+        ['2', 'unknown author'],
+        ['3', 'title already exists'],
+    ]
+
+    imported = await session.scalar(
+        select(Book).where(Book.title == 'dom casmurro')
+    )
+    assert imported.year == rows[0]['year']
+    assert imported.author_id == author.id
+
+
+def test_import_should_require_authentication(client):
+    response = client.post('/import/authors', content=b'name\nsomeone\n')
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_import_should_reject_unknown_kind(client, token):
+    response = client.post(
+        '/import/users',
+        headers={'Authorization': f'Bearer {token}'},
+        content=b'name\nsomeone\n',
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+async def test_import_catalog_should_read_files(session):
+    source = io.BytesIO(b'name\nclarice lispector\ncora coralina\n')
+    rejects = io.StringIO()
+
+    summary = await import_catalog(
+        session, 'authors', 'csv', iter_file(source, size=4), rejects
+    )
+
+    assert summary.imported == 2  # noqa: PLR2004
+    assert summary.rejected == 0
+    assert rejects.getvalue() == 'line,reason,value\r\n'
+    assert set(await session.scalars(select(Author.name))) == {
+        'clarice lispector',
+        'cora coralina',
+    }
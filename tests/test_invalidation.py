@@ -0,0 +1,229 @@
+import asyncio
+import json
+from contextlib import suppress
+from http import HTTPStatus
+
+import psycopg
+from sqlalchemy import delete, update
+
+from madr import security
+from madr.cache import TTLCache
+from madr.invalidation import (
+    CHANNEL,
+    InvalidationListener,
+    conninfo,
+    listener,
+    reload_revocations,
+)
+from madr.models import Book, User
+
+
+async def stop(task):
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+async def wait_for(predicate, timeout=5):
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+async def test_triggers_should_notify_updates_and_deletes(
+    engine, session, user, book
+):
+    async with await psycopg.AsyncConnection.connect(
+        conninfo(engine.url), autocommit=True
+    ) as conn:
+        await conn.execute(f'LISTEN {CHANNEL}')
+
+        await session.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(token_version=User.token_version + 1)
+        )
+        await session.execute(delete(Book).where(Book.id == book.id))
+        await session.commit()
+
+        payloads = [
+            json.loads(notify.payload)
+            async for notify in conn.notifies(timeout=1, stop_after=3)
+        ]
+
+    assert {'table': 'books', 'id': book.id} in payloads
+    assert {
+        'table': 'users',
+        'id': user.id,
+        'email': user.email,
+        'token_version': 1,
+    } in payloads
+
+
+async def test_listener_should_evict_notified_rows(engine, session, book):
+    cache = TTLCache('invalidated_books', maxsize=10)
+    cache.set(book.id, 'body')
+    books_listener = InvalidationListener(
+        conninfo(engine.url),
+        handlers={'books': lambda event: cache.pop(event['id'])},
+        caches=[],
+        heartbeat=1,
+        retry_max=1,
+    )
+    task = asyncio.create_task(books_listener.run())
+
+    try:
+        await wait_for(lambda: books_listener.connections)
+        await session.execute(
+            update(Book).where(Book.id == book.id).values(year=1999)
+        )
+        await session.commit()
+        await wait_for(lambda: cache.get(book.id) is None)
+    finally:
+        await stop(task)
+
+
+async def test_listener_should_dispatch_notifications_during_queries(
+    engine, session, book
+):
+    cache = TTLCache('invalidated_during_queries', maxsize=10)
+    cache.set(book.id, 'body')
+    books_listener = InvalidationListener(
+        conninfo(engine.url),
+        handlers={'books': lambda event: cache.pop(event['id'])},
+        caches=[],
+        heartbeat=1,
+        retry_max=1,
+    )
+
+    async with await psycopg.AsyncConnection.connect(
+        conninfo(engine.url), autocommit=True
+    ) as conn:
+        await books_listener._subscribe(conn)
+        await session.execute(
+            update(Book).where(Book.id == book.id).values(year=1999)
+        )
+        await session.commit()
+
+        # Only queries run here, like the heartbeat, never ``notifies()``.
+        async with asyncio.timeout(5):
+            while cache.get(book.id) is not None:
+                await conn.execute('SELECT 1')
+
+    assert books_listener.synced.is_set()
+
+
+async def test_listener_should_reload_revocations_on_connect(
+    engine, session, user
+):
+    version = user.token_version + 1
+    await session.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(token_version=User.token_version + 1)
+    )
+    await session.commit()
+    reloading_listener = InvalidationListener(
+        conninfo(engine.url),
+        {},
+        [],
+        heartbeat=1,
+        retry_max=1,
+        resync=reload_revocations,
+    )
+
+    async with await psycopg.AsyncConnection.connect(
+        conninfo(engine.url), autocommit=True
+    ) as conn:
+        await reloading_listener._subscribe(conn)
+
+    assert security.token_revocations.get(user.id) == version
+
+
+async def test_listener_should_revoke_tokens_of_deleted_users_on_connect(
+    client, session, user, token, monkeypatch
+):
+    monkeypatch.setattr(security.settings, 'JWT_STATELESS_PRINCIPAL', True)
+    monkeypatch.setattr(security, 'revocations_synced', asyncio.Event())
+    await session.execute(delete(User).where(User.id == user.id))
+    await session.commit()
+    # This worker missed the notification of the delete.
+    security.token_revocations.clear()
+    reloading_listener = InvalidationListener(
+        conninfo(session.bind.url),
+        {},
+        [],
+        heartbeat=1,
+        retry_max=1,
+        resync=reload_revocations,
+        synced=security.revocations_synced,
+    )
+
+    async with await psycopg.AsyncConnection.connect(
+        conninfo(session.bind.url), autocommit=True
+    ) as conn:
+        await reloading_listener._subscribe(conn)
+
+    response = client.post(
+        '/auth/refresh_token', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert security.revocations_synced.is_set()
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+async def test_listener_should_clear_caches_on_connect(engine):
+    cache = TTLCache('invalidated_on_connect', maxsize=10)
+    cache.set('key', 'value')
+    clearing_listener = InvalidationListener(
+        conninfo(engine.url), {}, [cache], heartbeat=1, retry_max=1
+    )
+    task = asyncio.create_task(clearing_listener.run())
+
+    try:
+        await wait_for(lambda: clearing_listener.connections)
+    finally:
+        await stop(task)
+
+    assert cache.get('key') is None
+
+
+async def test_listener_should_keep_retrying_when_unreachable():
+    unreachable = InvalidationListener(
+        'host=/nonexistent dbname=madr', {}, [], heartbeat=1, retry_max=1
+    )
+    task = asyncio.create_task(unreachable.run())
+    await asyncio.sleep(0.1)
+
+    assert not task.done()
+    assert not unreachable.synced.is_set()
+    await stop(task)
+
+
+def test_dispatch_should_ignore_malformed_payloads():
+    events = []
+    books_listener = InvalidationListener(
+        '', {'books': events.append}, [], heartbeat=1, retry_max=1
+    )
+
+    for payload in ('not json', '[]', '{"id": 1}', '{"table": "users"}'):
+        books_listener.dispatch(payload)
+
+    assert events == []
+
+
+def test_user_events_should_drop_principal_and_revoke_tokens(user):
+    version = user.token_version + 1
+    security.principal_cache.set(user.email, user)
+
+    listener.dispatch(
+        json.dumps({
+            'table': 'users',
+            'id': user.id,
+            'email': user.email,
+            'token_version': version,
+        })
+    )
+
+    assert security.principal_cache.get(user.email) is None
+    assert security.token_revocations.get(user.id) == version
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from sqlalchemy import select, text
+
+from madr.models import Book
+
+HOT_TABLES = {'books', 'authors'}
+
+HOT_REQUESTS = [
+    '/books',
+    '/books?title=book 12345',
+    '/books?year=1950',
+    '/books?order_by=title',
+    '/books?order_by=year&year=1950',
+    '/books?expand=author',
+    '/books?fields=id,title&order_by=title',
+    '/authors',
+    '/authors?name=author 4321',
+    '/authors?order_by=name',
+    '/authors?order_by=book_count',
+    '/authors/42?include=stats',
+    '/search?q=author 4321',
+]
+
+
+@pytest.fixture
+async def _catalog(session):
+    # Large enough that the planner only picks an index where it pays off.
+    await session.execute(
+        text(
+            "INSERT INTO authors (name) SELECT 'author ' || i "
+            'FROM generate_series(1, 50000) AS i'
+        )
+    )
+    await session.execute(
+        text(
+            "INSERT INTO books (title, year, author_id) SELECT 'book ' || i, "
+            '1900 + i % 120, 1 + i % 50000 '
+            'FROM generate_series(1, 100000) AS i'
+        )
+    )
+    await session.commit()
+    await session.execute(text('ANALYZE authors, books'))
+
+
+INDEX_SCANS = {'Index Scan', 'Index Only Scan'}
+
+
+def seq_scans(plan):
+    """Hot tables read in full, either sequentially or by walking a whole
+    index while filtering every entry."""
+    node = plan.get('Node Type')
+    if node == 'Seq Scan' or (
+        node in INDEX_SCANS and 'Filter' in plan and 'Index Cond' not in plan
+    ):
+        yield plan['Relation Name']
+
+    for child in plan.get('Plans', []):
+        yield from seq_scans(child)
+
+
+async def explain(session, statement, parameters):
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(
+        f'EXPLAIN (FORMAT JSON) {statement}', parameters
+    )
+    plan = result.scalar()
+    await session.rollback()
+
+    return plan if isinstance(plan, list) else json.loads(plan)
+
+
+@pytest.mark.usefixtures('_catalog')
+@pytest.mark.parametrize('url', HOT_REQUESTS)
+async def test_hot_queries_should_not_scan_sequentially(
+    client, session, queries, url
+):
+    response = client.get(url)
+    assert response.json()
+
+    statements = list(queries)
+    assert statements
+    for statement, parameters in statements:
+        plan = await explain(session, statement, parameters)
+        scanned = set(seq_scans(plan[0]['Plan'])) & HOT_TABLES
+        assert not scanned, f'{url} scans {scanned}: {statement}'
+
+
+@pytest.mark.usefixtures('_catalog')
+async def test_author_books_lookup_should_use_index(session):
+    statement = select(Book).where(Book.author_id == 1)
+    compiled = statement.compile(dialect=session.bind.dialect)
+
+    plan = await explain(session, str(compiled), compiled.params)
+
+    assert not set(seq_scans(plan[0]['Plan'])) & HOT_TABLES
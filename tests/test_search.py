@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+
+from madr.routes.search import build_tsquery
+from tests.conftest import AuthorFactory, BookFactory
+
+
+@pytest.mark.parametrize(
+    ('text', 'expected'),
+    [
+        ('Tolkien  Ring 1954', 'tolkien:* & ring:* & 1954:*'),
+        ("o'brien & (1984)", 'o:* & brien:* & 1984:*'),
+        ('!!!', ''),
+    ],
+)
+def test_build_tsquery_should_prefix_every_word(text, expected):
+    assert build_tsquery(text) == expected
+
+
+async def test_search_should_match_title_author_and_year(client, session):
+    author = AuthorFactory(name='j r r tolkien')
+    session.add(author)
+    await session.commit()
+    book = BookFactory(
+        title='the lord of the rings', year=1954, author_id=author.id
+    )
+    session.add_all([book, BookFactory(year=1954, author_id=author.id)])
+    await session.commit()
+
+    response = client.get('/search', params={'q': 'Tolkien ring 1954'})
+
+    assert response.status_code == HTTPStatus.OK
+    books = response.json()['books']
+    assert [b['id'] for b in books] == [book.id]
+    assert books[0]['rank'] > 0
+
+
+async def test_search_should_rank_title_matches_first(client, session):
+    author = AuthorFactory(name='dune lover')
+    session.add(author)
+    await session.commit()
+    by_author = BookFactory(title='a random book', author_id=author.id)
+    by_title = BookFactory(title='dune', author_id=author.id)
+    session.add_all([by_author, by_title])
+    await session.commit()
+
+    response = client.get('/search?q=dune')
+
+    assert [b['id'] for b in response.json()['books']] == [
+        by_title.id,
+        by_author.id,
+    ]
+
+
+async def test_search_should_follow_author_renames(client, session, book):
+    book.author.name = 'ursula k le guin'
+    await session.commit()
+
+    response = client.get('/search?q=guin')
+
+    assert [b['id'] for b in response.json()['books']] == [book.id]
+
+
+def test_search_without_words_should_return_empty(client):
+    response = client.get('/search?q=???')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'books': []}
@@ -1,8 +1,17 @@
+import asyncio
+import os
+import time
+from http import HTTPStatus
 from unittest.mock import patch
 
-from jwt import decode
+import pytest
+from fastapi import HTTPException
+from freezegun import freeze_time
+from httpx import ASGITransport, AsyncClient
+from jwt import ExpiredSignatureError, decode
 
 from madr import security
+from madr.app import app
 from madr.settings import Settings
 
 settings = Settings()
@@ -40,3 +49,79 @@ def test_create_access_token_should_generate_valid_jwt():
 
     assert result['sub'] == data['sub']
     assert 'exp' in result.keys()
+
+
+async def test_hashing_pool_should_hash_and_verify_off_loop():
+    pool = security.HashingPool(workers=1, queue_size=1)
+    try:
+        hashed = await pool.run(security.get_password_hash, 'passwd')
+
+        assert await pool.run(security.verify_password, 'passwd', hashed)
+        assert not await pool.run(security.verify_password, 'wrong', hashed)
+    finally:
+        pool.shutdown()
+
+
+async def test_hashing_pool_should_reject_jobs_when_saturated():
+    pool = security.HashingPool(workers=1, queue_size=0)
+    try:
+        running = asyncio.create_task(pool.run(time.sleep, 0.5))
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(time.sleep, 0)
+        await running
+    finally:
+        pool.shutdown()
+
+    assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert exc_info.value.headers == {'Retry-After': '1'}
+
+
+async def test_hashing_pool_should_replace_broken_pools():
+    pool = security.HashingPool(workers=1, queue_size=1)
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(os._exit, 1)
+
+        assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert await pool.run(abs, -1) == 1
+    finally:
+        pool.shutdown()
+
+
+async def test_get_book_should_not_wait_for_password_hashes(client, book):
+    hashes = [
+        asyncio.create_task(security.get_password_hash_async(f'passwd{i}'))
+        for i in range(4 * security.settings.PASSWORD_HASH_WORKERS)
+    ]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.get(f'/books/{book.id}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert not all(task.done() for task in hashes)
+    await asyncio.gather(*hashes)
+
+
+def test_decode_access_token_should_reuse_verified_claims():
+    token = security.create_access_token({'sub': 'test@test.com'})
+
+    first = security.decode_access_token(token)
+    with patch('madr.security.decode') as _decode:
+        second = security.decode_access_token(token)
+
+    assert first == second
+    _decode.assert_not_called()
+    assert security.verified_token_cache.hits == 1
+
+
+def test_decode_access_token_should_not_serve_expired_claims():
+    with freeze_time('2023-01-01 12:00:00'):
+        token = security.create_access_token({'sub': 'test@test.com'})
+        security.decode_access_token(token)
+
+    with freeze_time('2023-01-01 14:00:00'), pytest.raises(
+        ExpiredSignatureError
+    ):
+        security.decode_access_token(token)
@@ -96,3 +96,102 @@ def test_delete_user_should_return_forbidden(client, other_user, token):
 
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {'detail': 'Not enough permission'}
+
+
+async def test_delete_user_should_return_not_found_when_already_deleted(
+    client, session, user, cached_token
+):
+    await session.delete(user)
+    await session.commit()
+
+    response = client.delete(
+        f'/accounts/{user.id}',
+        headers={'Authorization': f'Bearer {cached_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'User does not exist'}
+
+
+def test_update_user_should_invalidate_principal(client, user, token):
+    user_request = {
+        'username': user.username,
+        'email': 'changed@email.com',
+        'password': user.clean_password,
+    }
+    response = client.put(
+        f'/accounts/{user.id}',
+        json=user_request,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.post(
+        '/auth/refresh_token', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_update_user_should_revoke_previous_tokens(client, user, token):
+    user_request = {
+        'username': user.username,
+        'email': user.email,
+        'password': 'new-passwd',
+    }
+    response = client.put(
+        f'/accounts/{user.id}',
+        json=user_request,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.post(
+        '/auth/refresh_token', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_create_user_should_report_email_conflict(client, user):
+    response = client.post(
+        '/accounts',
+        json={'username': 'someone', 'email': user.email, 'password': 'x'},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {'detail': 'Email already exists'}
+
+
+def test_user_writes_should_take_one_statement(
+    client, user, cached_token, queries
+):
+    headers = {'Authorization': f'Bearer {cached_token}'}
+    account = {'username': 'someone', 'email': 'a@b.com', 'password': 'x'}
+    renamed = {'username': 'renamed', 'email': 'c@d.com', 'password': 'y'}
+    requests = [
+        ('post', '/accounts', None, account),
+        ('put', f'/accounts/{user.id}', headers, renamed),
+    ]
+
+    for method, url, request_headers, payload in requests:
+        queries.clear()
+        response = client.request(
+            method, url, json=payload, headers=request_headers
+        )
+
+        assert response.status_code < HTTPStatus.BAD_REQUEST
+        assert len(queries) == 1, (url, queries)
+
+
+def test_delete_user_should_take_one_statement(
+    client, user, cached_token, queries
+):
+    queries.clear()
+    response = client.delete(
+        f'/accounts/{user.id}',
+        headers={'Authorization': f'Bearer {cached_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == 1